@@ -0,0 +1,219 @@
+# Copyright (c) 2021, Madawa Soysa
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+from functools import partial
+from weakref import WeakKeyDictionary
+
+import httpx
+
+from . import util
+from . import datasource as ds
+
+DC = util.DataSourceConstants
+
+log = logging.getLogger(__name__)
+
+_DEFAULT_CONCURRENCY = 64
+
+# Asynchronous variants of the synchronous data sources, kept for as long as the synchronous data source is referenced
+_ASYNC_VARIANTS = WeakKeyDictionary()
+
+
+def create_async_datasource(name):
+    """
+    Create asynchronous data source instance of the given data source name.
+
+    :param name: data source name
+    :return: asynchronous data source instance
+    :type: AsyncDataSource
+    """
+    config = ds._find_datasource_config(name)
+    return _ASYNC_DATASOURCE_TYPES.get(config.get(DC.TYPE), AsyncDataSource)(config)
+
+
+def async_variant(datasource):
+    """
+    Gets the asynchronous variant of a synchronous data source, created from the same configuration
+
+    :param datasource: synchronous data source
+    :type datasource: ds.DataSource
+    :return: asynchronous data source instance
+    :rtype: AsyncDataSource
+    """
+    config = datasource._config
+    variant = _ASYNC_VARIANTS.get(datasource)
+    if variant is None or not variant._is_initialized(config):
+        # The synchronous data source is initialized again when the config is reloaded
+        variant = _ASYNC_DATASOURCE_TYPES.get(config.get(DC.TYPE), AsyncDataSource)(config)
+        _ASYNC_VARIANTS[datasource] = variant
+    return variant
+
+
+class AsyncDataSource(ds.DataSource):
+    """
+    Generic asynchronous datasource. Requests are built the same way as the synchronous data sources and sent through
+    a shared httpx.AsyncClient, so that many requests can be in flight on a single event loop. The ``call_api`` methods
+    return coroutines.
+    """
+
+    # No __slots__ here: the async variants inherit from both this class and a synchronous data source, and slots on
+    # both bases would conflict in the instance layout
+
+    def __init__(self, config: dict):
+        if self._is_initialized(config):
+            return
+
+        if getattr(self, "_client", None) is not None:
+            # Initialized again with a reloaded config
+            AsyncDataSource.__release_client(self._client, self._loop)
+        self._client = None
+        self._semaphore = None
+        self._loop = None
+        super().__init__(config)
+        self._concurrency = config.get(DC.CONCURRENCY, _DEFAULT_CONCURRENCY)
+        self._http2 = config.get(DC.HTTP_BACKEND) == ds._HTTPX_BACKEND and config.get(DC.HTTP2, True)
+
+    @staticmethod
+    def _create_session(config):
+        # The async client is bound to the running event loop, hence it is created with the first request
+        return None
+
+    def _get_client(self):
+        """
+        Returns the HTTP client of the data source, creating it on first use on the running event loop. Connections
+        cannot be shared between event loops, so a new client is created when the data source is used from another
+        event loop, and the client of the previous event loop is released
+
+        :return: HTTP client
+        :rtype: httpx.AsyncClient
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            if self._client is not None:
+                AsyncDataSource.__release_client(self._client, self._loop)
+            self._loop = loop
+            limits = httpx.Limits(max_connections=self._concurrency, max_keepalive_connections=self._concurrency)
+            self._client = httpx.AsyncClient(params=self._default_params, limits=limits, timeout=self._timeout,
+                                             http2=self._http2)
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+        return self._client
+
+    @staticmethod
+    def __release_client(client, loop):
+        """
+        Closes the client of another event loop. A client can only be closed on the event loop it was used on, so the
+        client is closed on that loop if the loop is still running. The connections of a client whose event loop is no
+        longer running, e.g. after asyncio.run() returned, are only released when the client is garbage collected, so
+        close the data source with ``await close()`` or ``async with`` before the event loop ends
+
+        :param client: HTTP client to close
+        :param loop: event loop the client was used on
+        """
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+    def _set_default_params(self, params: dict):
+        super()._set_default_params(params)
+        if self._client is not None:
+            self._client.params = params
+
+    async def _call_api(self, resource, params=None, headers=None, **kwargs):
+        url, key, response, stale, headers = self._begin_request(resource, params, headers, **kwargs)
+        if response is None:
+            token = self._auth_token
+            response = await self._send(url, params, headers)
+            if self._retry_with_next_token(response, token):
+                response = await self._send(url, params, headers)
+            response = self._complete_request(key, response, stale, **kwargs)
+        return response
+
+    async def _send(self, url, params, headers):
+        if self._limiter is not None:
+            delay = self._limiter.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        client = self._get_client()
+        async with self._semaphore:
+            return await client.get(url, params=params, headers=headers)
+
+    async def call_api_batch(self, function, symbols, **kwargs):
+        """
+        Invokes the backend API for multiple symbols concurrently
+
+        :param function: function/resource to invoke
+        :param symbols: tickers/symbols
+        :param kwargs: additional parameters to pass to the backend
+        :return: response data keyed by symbol, in the order the symbols were given
+        :rtype: dict
+        """
+        symbols = list(dict.fromkeys(symbols))
+        responses = await asyncio.gather(*[self.call_api(function, symbol, **kwargs) for symbol in symbols])
+        return dict(zip(symbols, responses))
+
+    def __enter__(self):
+        raise TypeError(f"{type(self).__name__} is asynchronous, use 'async with' instead of 'with'")
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        raise TypeError(f"{type(self).__name__} is asynchronous, use 'async with' instead of 'with'")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """
+        Releases the pooled connections held by the data source. Connections are bound to the event loop they were
+        opened on, so the data source should be closed before that event loop ends
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+            self._loop = None
+
+
+class AsyncIEXCloud(AsyncDataSource, ds.IEXCloud):
+    """
+    Asynchronous data source to fetch data from IEX Could API
+    """
+
+
+class AsyncAlphaVantage(AsyncDataSource, ds.AlphaVantage):
+    """
+    Asynchronous data source to fetch data from Alpha Vantage data API
+    """
+
+
+class AsyncYahooFinance(AsyncDataSource, ds.YahooFinance):
+    """
+    Asynchronous data source which extracts data from Yahoo Finance API. yfinance is a blocking library, so the calls
+    are run in the default executor of the event loop
+    """
+
+    async def _call_api(self, resource, params=None, headers=None, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(ds.YahooFinance._call_api, self, resource, params, headers,
+                                                        **kwargs))
+
+
+# Asynchronous data source classes by the type given in the data source configuration
+_ASYNC_DATASOURCE_TYPES = {
+    "IEXCloud": AsyncIEXCloud,
+    "AlphaVantage": AsyncAlphaVantage,
+    "YahooFinance": AsyncYahooFinance
+}
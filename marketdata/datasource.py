@@ -15,11 +15,20 @@
 import os
 import logging
 import requests
+from threading import Lock
+from collections import deque
 from weakref import WeakValueDictionary
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-import yfinance as yf
+try:
+    import httpx
+except ImportError:
+    httpx = None
 
 from . import util
+from .ratelimit import TokenBucket
 from .exceptions import DataSourceException
 
 DC = util.DataSourceConstants
@@ -27,38 +36,112 @@ CC = util.CommonConstants
 
 log = logging.getLogger(__name__)
 
+_DEFAULT_TIMEOUT = 10
+_DEFAULT_RETRY_COUNT = 3
+_DEFAULT_RETRY_DELAY = 0.3
+_DEFAULT_POOL_SIZE = 32
+_DEFAULT_RESPONSE_CACHE_CAPACITY = 128
+_DEFAULT_RESPONSE_CACHE_EXPIRY = 60
+_RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+_RETRY_METHODS = frozenset(("GET",))
+_DEFAULT_REVALIDATION_EXPIRY = 24 * 60 * 60
+_NOT_MODIFIED = 304
+_ETAG = "ETag"
+_LAST_MODIFIED = "Last-Modified"
+_TOO_MANY_REQUESTS = 429
+_DEFAULT_BATCH_WORKERS = 8
+_ENV_VARIABLE_PREFIX = DC.ENV_VARIABLE_PREFIX
+_ENV_VARIABLE_PREFIX_LENGTH = len(_ENV_VARIABLE_PREFIX)
+_HTTPX_BACKEND = "httpx"
+
+# Responses and errors of the HTTP libraries data sources can send requests with
+HTTP_RESPONSE_TYPES = (requests.models.Response,) + ((httpx.Response,) if httpx else ())
+HTTP_ERRORS = (requests.exceptions.RequestException,) + ((httpx.HTTPError,) if httpx else ())
+
+
+__DATASOURCE_INDEX = (None, {})
+
+
+def _datasource_index(config):
+    """
+    Indexes the data source configurations in the app config by name. The index is only rebuilt when a different app
+    config is passed, i.e. when the app config is reloaded
 
-def create_datasource(name):
+    :param config: app config
+    :return: dictionary of data source configurations keyed by the data source name
+    :rtype: dict
     """
-    Create data source instance of the given data source name.
+    global __DATASOURCE_INDEX
 
-    The function attempts to find the data source config from the config file and creates an instance
-    by passing the config to create the instance
+    indexed_config, index = __DATASOURCE_INDEX
+    if indexed_config is not config:
+        index = {datasource_config[DC.NAME]: datasource_config for datasource_config in config[DC.DATA_SOURCES_PARENT]}
+        __DATASOURCE_INDEX = (config, index)
+    return index
+
+
+def _is_success(response):
+    """
+    Checks whether the HTTP response of a request is successful
+
+    :param response: HTTP response
+    :return: true if the response has a successful status code
+    """
+    if httpx is not None and isinstance(response, httpx.Response):
+        return response.is_success
+    return response.ok
+
+
+def _find_datasource_config(name):
+    """
+    Finds the configuration of the data source with the given name in the app config
 
     :param name: data source name
-    :return: data source instance
-    :type: DataSource
+    :return: data source configuration
+    :rtype: dict
+    :raises ValueError when the app config does not contain a data source with the given name
     """
     config = util.read_app_config(override_config=False)
-    if isinstance(config, dict):
-        datasource_list = config[DC.DATA_SOURCES_PARENT]
-    else:
+    if not isinstance(config, dict):
         raise TypeError("config is not a dict")
-    config = next(filter(lambda x: x[DC.NAME] == name, datasource_list), None)
+    config = _datasource_index(config).get(name)
 
     if not config:
         raise ValueError(f"Unable to find a configuration to a datasource with name: {name}")
+    return config
+
+
+def create_datasource(name):
+    """
+    Create data source instance of the given data source name.
 
-    try:
-        return globals()[config[DC.TYPE]](config)
-    except KeyError:
-        return DataSource(config)
+    The function attempts to find the data source config from the config file and creates an instance
+    by passing the config to create the instance. This is the intended entry point to obtain a data source; instances
+    are shared per data source name and type for as long as they are referenced
+
+    :param name: data source name
+    :return: data source instance
+    :type: DataSource
+    """
+    config = _find_datasource_config(name)
+    return _DATASOURCE_TYPES.get(config.get(DC.TYPE), DataSource)(config)
 
 
 class DataSource(object):
     """
     Generic datasource class for retrieving market data using data providers.
+
+    Constructing a data source with the config of a data source which is still referenced returns that instance, so
+    that its pooled connections, response cache and rate limiter are shared. The instances are tracked with weak
+    references and without locking.
     """
+    __slots__ = ("__weakref__", "__name", "_auth_token", "_base_url", "_resource_mapping", "_resource_formatters",
+                 "_config", "_timeout", "_session", "_default_params", "_response_cache", "_validated_responses",
+                 "_cache_ttl", "_fallback_codes", "_limiter", "_tokens", "_limiters", "_token_lock")
+
+    # Query parameter the auth token is sent with. Tokens can only be rotated for data sources which send it
+    _auth_param_name = None
+
     _instances = WeakValueDictionary()
 
     def __new__(cls, config):
@@ -70,23 +153,27 @@ class DataSource(object):
         if not config or not isinstance(config, dict):
             raise DataSourceException("Configuration object is empty or not a required type")
 
-        existing = DataSource._instances.get(config[DC.NAME])
-        if existing is not None and existing.__class__ is cls:
-            return existing
-        else:
-            new_instance = super().__new__(cls)
-            cls._instances[config[DC.NAME]] = new_instance
-            return new_instance
+        instances = DataSource._instances
+        key = (cls, config[DC.NAME])
+        instance = instances.get(key)
+        if instance is None:
+            instance = object.__new__(cls)
+            instances[key] = instance
+        return instance
 
     def __init__(self, config: dict):
         """
-        Creates a DataSource instance
+        Creates a DataSource instance. Constructing a shared data source again with the same config returns without
+        validating the config again. A reloaded config re-initializes the data source
 
         :param config a dictionary containing configuration values of the data source
         :type config: dict
         :raises DataSourceException if token is not provided for an authenticated data source
         :rtype DataSourceException
         """
+        if self._is_initialized(config):
+            return
+
         try:
             self._validate_config(config)
         except (TypeError, ValueError) as e:
@@ -94,9 +181,34 @@ class DataSource(object):
         else:
             self.__name = config.get(DC.NAME)
             self._auth_token = config.get(DC.AUTH_TOKEN)
+            self._tokens = None
+            if isinstance(self._auth_token, list):
+                self._tokens = deque(self._auth_token)
+                self._auth_token = self._tokens[0]
             self._base_url = config.get(DC.API_BASE_URL)
             self._resource_mapping = config.get(DC.RESOURCES_MAPPING)
+            self._resource_formatters = {function: DataSource._compile_resource(resource) for function, resource in
+                                         (self._resource_mapping or {}).items() if isinstance(resource, str)}
             self._config = config
+            self._timeout = config.get(DC.HTTP_TIMEOUT, _DEFAULT_TIMEOUT)
+            previous_session = getattr(self, "_session", None)
+            if previous_session is not None:
+                # Initialized again with a reloaded config. The connections pooled for the previous config are released
+                previous_session.close()
+            self._session = self._create_session(config)
+            self._default_params = {}
+            self._response_cache = util.LRUCache(
+                config.get(DC.CACHE_CAPACITY, _DEFAULT_RESPONSE_CACHE_CAPACITY),
+                config.get(DC.CACHE_EXPIRY, _DEFAULT_RESPONSE_CACHE_EXPIRY))
+            # Responses which can be revalidated with the provider once they expire from the response cache
+            self._validated_responses = util.LRUCache(self._response_cache.capacity, _DEFAULT_REVALIDATION_EXPIRY)
+            self._cache_ttl = config.get(DC.CACHE_TTL) or {}
+            self._fallback_codes = frozenset(config.get(DC.HTTP_FALLBACK_CODE_LIST) or ())
+            self._limiters = {tok: DataSource._create_limiter(config) for tok in self._tokens} if self._tokens \
+                else None
+            self._limiter = self._limiters[self._auth_token] if self._limiters \
+                else DataSource._create_limiter(config)
+            self._token_lock = Lock()
 
     @property
     def name(self):
@@ -106,27 +218,276 @@ class DataSource(object):
     def name(self, name):
         self.__name = name
 
+    def _is_initialized(self, config):
+        """
+        Checks whether the data source has already been initialized with the given config
+
+        :param config: configuration dictionary
+        :return: true if the data source was initialized with the same config object
+        """
+        return getattr(self, "_config", None) is config
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Releases the pooled connections held by the data source. Data sources are shared by name, so this closes the
+        connections of every user of the data source
+        """
+        self._session.close()
+
+    def _set_default_params(self, params: dict):
+        """
+        Sets the query parameters sent with every request of the data source, e.g. the authentication token. Parameters
+        passed to a request take precedence over the default parameters
+
+        :param params: default query parameters
+        """
+        self._default_params = params
+        if self._session is not None:
+            self._session.params = params
+
+    def _rotate_token(self, failed_token):
+        """
+        Switches to the next auth token after the provider rejected the current token for exceeding its rate limit.
+        Each token keeps its own rate limiter
+
+        :param failed_token: token which was used to send the rejected request
+        :return: true if the next request should be sent with a different token
+        :rtype: bool
+        """
+        if not self._auth_param_name or not self._tokens or len(self._tokens) < 2:
+            return False
+
+        with self._token_lock:
+            # Another request has already moved on from the failed token
+            if self._auth_token == failed_token:
+                self._tokens.rotate(-1)
+                self._auth_token = self._tokens[0]
+                self._limiter = self._limiters[self._auth_token]
+                self._set_default_params({**self._default_params, self._auth_param_name: self._auth_token})
+                log.warning("Rate limit exceeded for an auth token of %s. Switching to the next token", self.name)
+        return True
+
+    @staticmethod
+    def _create_session(config):
+        """
+        Creates a HTTP session which keeps the connections to the data source alive between requests. Failed requests
+        are retried with a backoff on the same pooled connections.
+
+        An httpx client is created instead when the data source sets ``httpBackend: httpx``. It multiplexes concurrent
+        requests over HTTP/2 connections unless ``http2`` is disabled, and only retries requests which failed to connect
+
+        :param config: configuration dictionary
+        :return: HTTP session
+        :rtype: requests.Session
+        """
+        pool_size = config.get(DC.POOL_SIZE, _DEFAULT_POOL_SIZE)
+        if config.get(DC.HTTP_BACKEND) == _HTTPX_BACKEND:
+            if httpx is None:
+                raise DataSourceException("httpx is required to use the httpx HTTP backend")
+            limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+            transport = httpx.HTTPTransport(http2=config.get(DC.HTTP2, True), limits=limits,
+                                            retries=config.get(DC.RETRY_COUNT, _DEFAULT_RETRY_COUNT))
+            return httpx.Client(transport=transport)
+
+        status_codes = _RETRY_STATUS_CODES
+        if isinstance(config.get(DC.AUTH_TOKEN), list):
+            # Rate limited requests are retried with the next token instead of backing off
+            status_codes = tuple(code for code in status_codes if code != _TOO_MANY_REQUESTS)
+        retry = Retry(total=config.get(DC.RETRY_COUNT, _DEFAULT_RETRY_COUNT),
+                      backoff_factor=config.get(DC.RETRY_DELAY, _DEFAULT_RETRY_DELAY),
+                      status_forcelist=status_codes, allowed_methods=_RETRY_METHODS,
+                      respect_retry_after_header=True, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @staticmethod
+    def _create_limiter(config):
+        """
+        Creates the rate limiter of the data source from the configured provider limit, e.g. 5 requests per 60s
+
+        :param config: configuration dictionary
+        :return: rate limiter or None if the data source is not rate limited
+        :rtype: TokenBucket
+        """
+        rate_limit = config.get(DC.RATE_LIMIT)
+        if not rate_limit:
+            return None
+
+        requests_per_period = rate_limit[DC.RATE_LIMIT_REQUESTS]
+        return TokenBucket(requests_per_period / rate_limit.get(DC.RATE_LIMIT_PERIOD, 1), requests_per_period)
+
     def _prepare_url(self, resource, **kwargs):
         """
         Combines the base url and resource to generate the complete URI of the resource to access
 
-        :param resource: resource to access
+        :param resource: resource to access. Resource mappings start with a '/'
         :param kwargs: additional parameters
         :return: url to call
         """
-        return f"{self._base_url}/{resource}"
+        return self._base_url + resource
 
     def _call_api(self, resource, params=None, headers=None, **kwargs):
         """
-        Executes HTTP GET request for the given resource and fetch data
+        Executes HTTP GET request for the given resource and fetch data. Successful responses are cached for the TTL
+        configured for the function, or the data source cache expiry when the function has no TTL of its own.
 
         :param resource: resource path
         :param params: query parameters to append to the request
         :param headers: HTTP headers to include to the request
+        :param kwargs: additional parameters
+               function: function the resource belongs to. Used to look up the cache TTL. [str]
+               force_refresh: bypasses the cached response and fetches the data again. [bool]
         :return: response data from the request
         """
+        url, key, response, stale, headers = self._begin_request(resource, params, headers, **kwargs)
+        if response is None:
+            token = self._auth_token
+            response = self._send(url, params, headers)
+            if self._retry_with_next_token(response, token):
+                response = self._send(url, params, headers)
+            response = self._complete_request(key, response, stale, **kwargs)
+        return response
+
+    def _begin_request(self, resource, params, headers, **kwargs):
+        """
+        Builds the request url and looks up the response cache. When no cached response can be served, the validators
+        of the last response are added to the request headers
+
+        :param resource: resource path
+        :param params: query parameters of the request
+        :param headers: HTTP headers of the request
+        :param kwargs: additional parameters
+        :return: request url, cache key, cached response or None, last response which can be revalidated or None, and
+                 the headers to send
+        :rtype: tuple
+        """
         url = self._prepare_url(resource, **kwargs)
-        return requests.get(url=url, params=params, headers=headers)
+        key, response = self._get_cached_response(url, params, headers, **kwargs)
+        stale = None
+        if response is None:
+            stale, headers = self._conditional_headers(key, headers)
+        return url, key, response, stale, headers
+
+    def _retry_with_next_token(self, response, token):
+        """
+        Checks whether a request rejected for exceeding the rate limit should be sent again with the next auth token
+
+        :param response: received response
+        :param token: token which was used to send the request
+        :return: true if the request should be sent again
+        :rtype: bool
+        """
+        return response.status_code == _TOO_MANY_REQUESTS and self._rotate_token(token)
+
+    def _complete_request(self, key, response, stale, **kwargs):
+        """
+        Serves the last response when the provider answered with 304 Not Modified and caches successful responses
+
+        :param key: cache key of the request
+        :param response: received response
+        :param stale: last response of the request which was revalidated or None
+        :param kwargs: additional parameters
+        :return: response data of the request
+        """
+        if stale is not None and response.status_code == _NOT_MODIFIED:
+            response = stale
+        self._cache_response(key, response, _is_success(response), **kwargs)
+        return response
+
+    def _send(self, url, params, headers):
+        """
+        Sends the HTTP GET request once the rate limiter allows it
+
+        :param url: request url
+        :param params: query parameters of the request
+        :param headers: HTTP headers of the request
+        :return: response of the request
+        """
+        if self._limiter is not None:
+            self._limiter.acquire()
+        return self._session.get(url=url, params=params, headers=headers, timeout=self._timeout)
+
+    def _get_cached_response(self, url, params, headers, **kwargs):
+        """
+        Looks up the response cache for a request
+
+        :param url: request url
+        :param params: query parameters of the request
+        :param headers: HTTP headers of the request
+        :param kwargs: additional parameters
+        :return: cache key of the request and the cached response, or None if the response is not cached
+        :rtype: tuple
+        """
+        key = DataSource._cache_key(url, params, headers)
+        if key is None or kwargs.get(CC.FORCE_REFRESH):
+            return key, None
+        return key, self._response_cache.get(key)
+
+    def _cache_response(self, key, response, success, **kwargs):
+        """
+        Caches the response of a request if it was successful. Responses of functions with a cache ttl of 0 are never
+        cached
+
+        :param key: cache key of the request
+        :param response: received response
+        :param success: whether the request was successful
+        :param kwargs: additional parameters
+        """
+        if key is not None and success:
+            ttl = self._cache_ttl.get(kwargs.get(CC.FUNCTION), -1)
+            if ttl != 0:
+                self._response_cache.put(key, response, ttl)
+            response_headers = getattr(response, "headers", None)
+            if response_headers and (response_headers.get(_ETAG) or response_headers.get(_LAST_MODIFIED)):
+                self._validated_responses.put(key, response)
+
+    def _conditional_headers(self, key, headers):
+        """
+        Adds the validators of the last response to the request headers so the provider can answer with
+        304 Not Modified instead of sending the same data again
+
+        :param key: cache key of the request
+        :param headers: HTTP headers of the request. Not modified
+        :return: last response of the request which can be revalidated or None, and the headers to send
+        :rtype: tuple
+        """
+        stale = self._validated_responses.get(key) if key is not None else None
+        if stale is None:
+            return None, headers
+
+        conditional = {}
+        etag = stale.headers.get(_ETAG)
+        if etag:
+            conditional["If-None-Match"] = etag
+        last_modified = stale.headers.get(_LAST_MODIFIED)
+        if last_modified:
+            conditional["If-Modified-Since"] = last_modified
+        return stale, {**headers, **conditional} if headers else conditional
+
+    @staticmethod
+    def _cache_key(url, params, headers):
+        """
+        Builds the response cache key of a request
+
+        :param url: request url
+        :param params: query parameters of the request
+        :param headers: HTTP headers of the request
+        :return: hashable cache key or None if the request contains values which cannot be hashed
+        """
+        try:
+            return (url, frozenset(params.items()) if params else None,
+                    frozenset(headers.items()) if headers else None)
+        except TypeError:
+            return None
 
     def call_api(self, function, symbol, **kwargs):
         """
@@ -136,9 +497,59 @@ class DataSource(object):
         :param symbol: ticker/symbol
         :param kwargs: additional parameters to pass to the backend
         :return: response data from the request
+        :raises ValueError when the function or the symbol is not provided
+        """
+        if function is None or symbol is None:
+            raise ValueError("Symbol and Function are required parameters")
+
+        resource, params = self._prepare_request(function, symbol, kwargs.pop(CC.PARAMS, None))
+        token = self._auth_token_for(kwargs)
+        # The default token is sent with the session parameters
+        if token is not None:
+            params = {**params, self._auth_param_name: token} if params else {self._auth_param_name: token}
+        return self._call_api(resource, params, kwargs.pop(CC.HEADERS, None), function=function, **kwargs)
+
+    def _prepare_request(self, function, symbol, params):
+        """
+        Prepares the resource and the query parameters to request the function for the symbol from the backend
+
+        :param function: function/resource to invoke
+        :param symbol: ticker/symbol
+        :param params: query parameters given by the caller. Must not be modified
+        :return: resource and query parameters
+        :rtype: tuple
+        """
+        return self._resource_formatters[function](symbol), params
+
+    def _auth_token_for(self, kwargs):
+        """
+        Finds the auth token requested for a single call instead of the default token
+
+        :param kwargs: additional parameters passed to the call
+        :return: auth token or None to use the default token
+        """
+        name = self._auth_param_name
+        return kwargs.get(name) if name else None
+
+    def call_api_batch(self, function, symbols, max_workers=_DEFAULT_BATCH_WORKERS, **kwargs):
         """
-        resource = self._resource_mapping[function].format(symbol)
-        return self._call_api(resource, kwargs.get(CC.PARAMS, None), kwargs.get(CC.HEADERS, None), **kwargs)
+        Invokes the backend API for multiple symbols concurrently. Requests share the pooled connections of the data
+        source
+
+        :param function: function/resource to invoke
+        :param symbols: tickers/symbols
+        :param max_workers: maximum number of requests in flight. default 8
+        :param kwargs: additional parameters to pass to the backend
+        :return: response data keyed by symbol, in the order the symbols were given
+        :rtype: dict
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(symbols))) as executor:
+            futures = {symbol: executor.submit(self.call_api, function, symbol, **kwargs) for symbol in symbols}
+            return {symbol: future.result() for symbol, future in futures.items()}
 
     def is_fallback_code(self, response):
         """
@@ -147,10 +558,7 @@ class DataSource(object):
         :param response: HTTP response
         :return: true if the error code exists in the fallback code list
         """
-        if response.status_code in self._config[DC.HTTP_FALLBACK_CODE_LIST]:
-            return True
-        else:
-            return False
+        return response.status_code in self._fallback_codes
 
     def _validate_config(self, config):
         """
@@ -166,19 +574,68 @@ class DataSource(object):
 
         if config.get(DC.IS_AUTHENTICATED):
             tok = config.get(DC.AUTH_TOKEN)
-            if not (tok and isinstance(tok, str)):
-                raise ValueError("API Authentication token is a required field and is missing in configuration")
-            elif config.get(DC.AUTH_TOKEN).startswith(DC.ENV_VARIABLE_PREFIX):
-                # Check if token is provided via env variable
-                tok = os.environ.get(tok[len(DC.ENV_VARIABLE_PREFIX):])
-                if not (tok and isinstance(tok, str)):
-                    # If env variable is empty or not a string
-                    raise ValueError(f"Auth token cannot be found in {tok[len(DC.ENV_VARIABLE_PREFIX):]} "
-                                     f"environment variable")
-                else:
-                    config[DC.AUTH_TOKEN] = tok
+            if tok and isinstance(tok, list):
+                # Multiple tokens are rotated when the provider rate limits a token
+                config[DC.AUTH_TOKEN] = [DataSource._resolve_token(t) for t in tok]
             else:
-                config[DC.AUTH_TOKEN] = tok
+                config[DC.AUTH_TOKEN] = DataSource._resolve_token(tok)
+
+        DataSource._validate_rate_limit(config)
+
+    @staticmethod
+    def _validate_rate_limit(config):
+        """
+        Validates the rate limit of the data source, if one is configured
+
+        :param config: configuration dictionary
+        :raises TypeError when the rate limit is not a dict or its values are not numbers
+        :raises ValueError when the number of requests or the period is not positive
+        """
+        rate_limit = config.get(DC.RATE_LIMIT)
+        if not rate_limit:
+            return
+        if not isinstance(rate_limit, dict):
+            raise TypeError("Rate limit should be a dict with the number of requests allowed per period")
+
+        for key, value in ((DC.RATE_LIMIT_REQUESTS, rate_limit.get(DC.RATE_LIMIT_REQUESTS)),
+                           (DC.RATE_LIMIT_PERIOD, rate_limit.get(DC.RATE_LIMIT_PERIOD, 1))):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise TypeError(f"Rate limit {key} should be a number")
+            if value <= 0:
+                raise ValueError(f"Rate limit {key} should be positive")
+
+    @staticmethod
+    def _compile_resource(template):
+        """
+        Compiles a resource template into a function which formats the resource for a symbol. Templates with a single
+        {} placeholder are formatted with printf-style formatting as it skips parsing the template on every call
+
+        :param template: resource template. E.g. /stock/{}/stats
+        :return: function which takes the symbol and returns the resource
+        """
+        if template.count("{") == template.count("}") == template.count("{}") == 1 and "%" not in template:
+            return template.replace("{}", "%s").__mod__
+        return template.format
+
+    @staticmethod
+    def _resolve_token(tok):
+        """
+        Resolves an auth token given in the configuration
+
+        :param tok: auth token or env.<VARIABLE> to read the token from an environment variable
+        :return: auth token
+        :raises ValueError when the token is missing
+        """
+        if not (tok and isinstance(tok, str)):
+            raise ValueError("API Authentication token is a required field and is missing in configuration")
+        elif tok.startswith(_ENV_VARIABLE_PREFIX):
+            # Check if token is provided via env variable
+            env_variable = tok[_ENV_VARIABLE_PREFIX_LENGTH:]
+            tok = os.environ.get(env_variable)
+            if not tok:
+                # If env variable is empty
+                raise ValueError(f"Auth token cannot be found in {env_variable} environment variable")
+        return tok
 
 
 class IEXCloud(DataSource):
@@ -186,18 +643,35 @@ class IEXCloud(DataSource):
     Data source to fetch data from IEX Could API
     """
 
-    __IEX_ENVIRONMENTS = ("sandbox", "production")
+    __slots__ = ("__version", "__default_env", "__url_by_env", "__default_url")
+
+    _auth_param_name = CC.TOKEN
+
+    # Tokens are resolved in this order, so the token dict and the warnings do not depend on the hash seed
+    __IEX_ENVIRONMENT_ORDER = ("sandbox", "production")
 
-    __IEX_VALID_VERSIONS = (
+    __IEX_ENVIRONMENTS = frozenset(__IEX_ENVIRONMENT_ORDER)
+
+    __IEX_DEFAULT_ENVIRONMENT = "sandbox"
+
+    __IEX_VALID_VERSIONS = frozenset((
         "stable",
         "latest",
         "v1"
-    )
+    ))
+
+    __IEX_DEFAULT_VERSION = "stable"
 
     def __init__(self, config: dict):
+        if self._is_initialized(config):
+            return
+
         super().__init__(config)
         self.__version = config.get(DC.API_VERSION)
         self.__default_env = config[DC.API_ENVIRONMENT]
+        self.__url_by_env = {env: f"{url}/{self.__version}" for env, url in self._base_url.items()}
+        self.__default_url = self.__url_by_env.get(self.__default_env)
+        self._set_default_params({CC.TOKEN: self._auth_token.get(self.__default_env)})
 
     def _validate_config(self, config):
         """
@@ -208,64 +682,55 @@ class IEXCloud(DataSource):
         :raises TypeError when value is present with an incorrect type
         :raises ValueError when incorrect value is present
         """
-        if not config.get(DC.API_BASE_URL) and isinstance(config.get(
-                DC.API_BASE_URL), dict):
+        base_url = config.get(DC.API_BASE_URL)
+        if not base_url or not isinstance(base_url, dict):
             raise TypeError("IEX Cloud API base url is required and should be a dict")
 
         auth_token = config.get(DC.AUTH_TOKEN)
         if not auth_token or not isinstance(auth_token, dict):
             raise ValueError("Authentication token is required to connect with IEX Cloud API")
-        else:
-            for env in IEXCloud.__IEX_ENVIRONMENTS:
-                tok = auth_token[env]
-                if not tok:
-                    log.warning(f"Auth token for {env} is not provided.")
-                    del auth_token[env]
-                elif tok.startswith(DC.ENV_VARIABLE_PREFIX):
-                    tok = os.environ.get(tok[len(DC.ENV_VARIABLE_PREFIX):])
-                    if not tok:
-                        log.warning(f"Auth token for {env} is not provided.")
-                        del auth_token[env]
-                    else:
-                        auth_token[env] = tok
-                else:
-                    auth_token[env] = tok
-
-        if not auth_token:
+
+        tokens = {}
+        for env in IEXCloud.__IEX_ENVIRONMENT_ORDER:
+            tok = auth_token.get(env)
+            if tok and tok.startswith(_ENV_VARIABLE_PREFIX):
+                tok = os.environ.get(tok[_ENV_VARIABLE_PREFIX_LENGTH:])
+            if tok:
+                tokens[env] = tok
+            else:
+                log.warning(f"Auth token for {env} is not provided.")
+
+        if not tokens:
             raise ValueError("Authentication token is not provided for none of the environments")
+        config[DC.AUTH_TOKEN] = tokens
+        DataSource._validate_rate_limit(config)
 
         IEXCloud.__validate_or_set_default(DC.API_ENVIRONMENT, config.get(DC.API_ENVIRONMENT),
-                                           IEXCloud.__IEX_ENVIRONMENTS[0], IEXCloud.__IEX_ENVIRONMENTS, config)
+                                           IEXCloud.__IEX_DEFAULT_ENVIRONMENT, IEXCloud.__IEX_ENVIRONMENTS, config)
+
+        if config[DC.API_ENVIRONMENT] not in tokens:
+            raise ValueError(f"Authentication token is not provided for the {config[DC.API_ENVIRONMENT]} environment")
 
-        IEXCloud.__validate_or_set_default(DC.API_VERSION, config.get(DC.API_VERSION), IEXCloud.__IEX_VALID_VERSIONS[0],
+        IEXCloud.__validate_or_set_default(DC.API_VERSION, config.get(DC.API_VERSION), IEXCloud.__IEX_DEFAULT_VERSION,
                                            IEXCloud.__IEX_VALID_VERSIONS, config)
 
     def _prepare_url(self, resource, **kwargs):
-        env = kwargs.get(DC.API_ENVIRONMENT, self.__default_env)
-        version = kwargs.get(DC.API_VERSION, self.__version)
-        return f"{self._base_url[env]}/{version}{resource}"
-
-    def call_api(self, function, symbol, **kwargs):
-        if function is None or symbol is None:
-            return ValueError("Symbol and Function are required parameters")
-        else:
-            params = kwargs.get(CC.PARAMS, None)
-            headers = kwargs.get(CC.HEADERS, None)
-            token = kwargs.get(CC.TOKEN, None)
-            env = kwargs.get(DC.API_ENVIRONMENT, self.__default_env)
-
-            params = {} if params is None else params
-
-            if token is not None:
-                params[CC.TOKEN] = token
-            else:
-                params[CC.TOKEN] = self._auth_token[env]
-
-            resource = self._resource_mapping[function].format(symbol)
-            return self._call_api(resource, params, headers, **kwargs)
+        env = kwargs.get(DC.API_ENVIRONMENT)
+        version = kwargs.get(DC.API_VERSION)
+        if version is None:
+            return (self.__default_url if env is None else self.__url_by_env[env]) + resource
+        return f"{self._base_url[env or self.__default_env]}/{version}{resource}"
+
+    def _auth_token_for(self, kwargs):
+        token = kwargs.get(CC.TOKEN)
+        if token is None:
+            env = kwargs.get(DC.API_ENVIRONMENT)
+            if env is not None:
+                return self._auth_token[env]
+        return token
 
     @staticmethod
-    def __validate_or_set_default(key: str, value: str, default: str, valid_values: tuple, config: dict):
+    def __validate_or_set_default(key: str, value: str, default: str, valid_values: frozenset, config: dict):
         """
         Validates a given value in config. If the value exist and acceptable, set the value or else set a default value
 
@@ -278,8 +743,8 @@ class IEXCloud(DataSource):
         if not value:
             log.warning(f"{key.capitalize()} is not provided. Default {key} {default} will be used")
             config[key] = default
-        elif value.startswith(DC.ENV_VARIABLE_PREFIX):
-            val = os.environ.get(value[len(DC.ENV_VARIABLE_PREFIX):])
+        elif value.startswith(_ENV_VARIABLE_PREFIX):
+            val = os.environ.get(value[_ENV_VARIABLE_PREFIX_LENGTH:])
             if not val or val not in valid_values:
                 log.warning(f"provided {key} {val} is invalid. Default {key} {default} will be used")
                 config[key] = default
@@ -297,43 +762,47 @@ class AlphaVantage(DataSource):
     Data source to fetch data from Alpha Vantage data API
     """
 
+    __slots__ = ()
+
     __apikey: str = "apikey"
+
+    _auth_param_name = __apikey
     __function: str = "function"
 
     def __init__(self, config):
+        if self._is_initialized(config):
+            return
+
         super().__init__(config)
+        self._set_default_params({AlphaVantage.__apikey: self._auth_token})
 
     def _prepare_url(self, resource, **kwargs):
         return super()._prepare_url(resource, **kwargs)
 
-    def call_api(self, function, symbol, **kwargs):
-        if function is None or symbol is None:
-            return ValueError("Symbol and Function are required parameters")
-        else:
-            params = kwargs.get(CC.PARAMS, None)
-            token = kwargs.get(AlphaVantage.__apikey)
-
-            params = {} if not params else params
-
-            params[AlphaVantage.__function] = self._resource_mapping[function],
-            params[CC.SYMBOL] = symbol
-
-            if token is not None:
-                params[AlphaVantage.__apikey] = token
-            else:
-                params[AlphaVantage.__apikey] = self._auth_token
-
-            return self._call_api("", params, kwargs.get(CC.HEADERS, None), **kwargs)
+    def _prepare_request(self, function, symbol, params):
+        params = {**params} if params else {}
+        params[AlphaVantage.__function] = self._resource_mapping[function]
+        params[CC.SYMBOL] = symbol
+        return "", params
 
 
 class YahooFinance(DataSource):
     """
     Data source which extracts data from Yahoo Finance API. Internally uses yfinance
-    (https://pypi.org/project/yfinance/)
+    (https://pypi.org/project/yfinance/), which is only imported once a Yahoo Finance data source is created as it
+    pulls in pandas
     """
 
+    __slots__ = ("__cache", "__functions", "__ticker_type")
+
     def __init__(self, config):
+        if self._is_initialized(config):
+            return
+
         super().__init__(config)
+        import yfinance as yf
+        self.__ticker_type = yf.Ticker
+        self.__functions = {function: getattr(yf.Ticker, name) for function, name in self._resource_mapping.items()}
         cache_capacity = config.get(DC.CACHE_CAPACITY, 10)
         cache_expiry = config.get(DC.CACHE_EXPIRY)
 
@@ -342,18 +811,40 @@ class YahooFinance(DataSource):
         else:
             self.__cache = util.LRUCache(cache_capacity)
 
+    def _validate_config(self, config):
+        """
+        Validates the config related to Yahoo Finance data source
+
+        :param config: Yahoo Finance configuration
+        :raises ValueError when a resource is not mapped to a yfinance Ticker function
+        """
+        super()._validate_config(config)
+        import yfinance as yf
+
+        resource_mapping = config.get(DC.RESOURCES_MAPPING)
+        if not resource_mapping or not isinstance(resource_mapping, dict):
+            raise ValueError("Resource mapping is required to extract data from Yahoo Finance")
+        for function, name in resource_mapping.items():
+            if not callable(getattr(yf.Ticker, name, None)):
+                raise ValueError(f"{function} is mapped to {name} which is not a yfinance Ticker function")
+
     def _call_api(self, resource, params=None, headers=None, **kwargs):
-        function = self._resource_mapping[resource]
-        symbol = params[CC.SYMBOL]
-        if self.__cache.get(symbol) is None:
-            tkr = yf.Ticker(symbol)
-            self.__cache.put(symbol, tkr)
-        else:
-            tkr = self.__cache.get(symbol)
-        return getattr(tkr, function)()
+        key, data = self._get_cached_response(resource, params, headers, **kwargs)
+        if data is not None:
+            return data
 
-    def call_api(self, function, symbol, **kwargs):
-        if function is None or symbol is None:
-            return ValueError("Symbol and Function are required parameters")
-        else:
-            return self._call_api(function, params={CC.SYMBOL: symbol}, headers=None, **kwargs)
+        tkr = self.__cache.get_or_create(params[CC.SYMBOL], self.__ticker_type)
+        data = self.__functions[resource](tkr)
+        self._cache_response(key, data, data is not None, **kwargs)
+        return data
+
+    def _prepare_request(self, function, symbol, params):
+        return function, {CC.SYMBOL: symbol}
+
+
+# Data source classes by the type given in the data source configuration
+_DATASOURCE_TYPES = {
+    "IEXCloud": IEXCloud,
+    "AlphaVantage": AlphaVantage,
+    "YahooFinance": YahooFinance
+}
@@ -18,7 +18,7 @@ class DataSourceException(Exception):
     """
     def __init__(self, message, *args):
         self.__message = message
-        super().__init__(message, args)
+        super().__init__(message, *args)
 
     def __str__(self):
         return self.__message
@@ -26,4 +26,4 @@ class DataSourceException(Exception):
 
 class MarketDataException(Exception):
     def __init__(self, message, *args):
-        super().__init__(message, args)
+        super().__init__(message, *args)
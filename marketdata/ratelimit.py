@@ -0,0 +1,72 @@
+# Copyright (c) 2021, Madawa Soysa
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+from threading import Lock
+
+
+class TokenBucket(object):
+    """
+    Token bucket rate limiter. Tokens are refilled continuously at the given rate up to the capacity of the bucket and
+    each request takes tokens from the bucket. Limiter operations are thread safe
+    """
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initializes a token bucket which starts full
+
+        :param rate: number of tokens added to the bucket per second
+        :param capacity: maximum number of tokens in the bucket, i.e. the allowed burst size
+        """
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("Rate and capacity of a token bucket should be positive")
+
+        self.__rate = rate
+        self.__capacity = capacity
+        self.__tokens = capacity
+        self.__last = time.monotonic()
+        self.__lock = Lock()
+
+    @property
+    def rate(self):
+        return self.__rate
+
+    @property
+    def capacity(self):
+        return self.__capacity
+
+    def reserve(self, tokens: float = 1):
+        """
+        Takes tokens from the bucket. When the bucket does not hold enough tokens they are borrowed from the future
+        refills, so that concurrent callers queue up behind each other instead of racing for the same tokens
+
+        :param tokens: number of tokens to take. default 1
+        :return: number of seconds the caller should wait before sending the request
+        :rtype: float
+        """
+        with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(self.__capacity, self.__tokens + (now - self.__last) * self.__rate)
+            self.__last = now
+            self.__tokens -= tokens
+            return 0 if self.__tokens >= 0 else -self.__tokens / self.__rate
+
+    def acquire(self, tokens: float = 1):
+        """
+        Takes tokens from the bucket and blocks until the request is allowed to be sent
+
+        :param tokens: number of tokens to take. default 1
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
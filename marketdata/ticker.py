@@ -24,9 +24,23 @@ log = logging.getLogger(__name__)
 DC = util.DataSourceConstants
 CC = util.CommonConstants
 
+# Errors of a fallback request which are raised as MarketDataException. httpx errors are not IOErrors
+_FALLBACK_ERRORS = (IOError,) + ds.HTTP_ERRORS
+
+
+class _AppConfig:
+    """
+    Reads the app config on first access instead of when the module is imported
+    """
+
+    def __get__(self, instance, owner):
+        return util.read_app_config(override_config=False)
+
 
 class Ticker:
-    _CONFIG = util.read_app_config()
+    __slots__ = ("__symbol", "__datasource", "__fallback_datasource")
+
+    _CONFIG = _AppConfig()
 
     def __init__(self, symbol, datasource=None, fallback_datasource=None):
         self.__symbol = symbol
@@ -75,10 +89,28 @@ class Ticker:
         :return: ticker summary
         """
         local_datasource = self.__get_local_datasource(**kwargs)
-        if isinstance(local_datasource, ds.IEXCloud) and kwargs.get("advanced-stats") is True:
-            return self.__handle_request(local_datasource, CC.SUMMARY_ADVANCED, **kwargs)
+        return self.__handle_request(local_datasource, Ticker.__summary_function(local_datasource, kwargs), **kwargs)
+
+    async def get_summary_async(self, **kwargs):
+        """
+        Get summary of the given ticker symbol without blocking the event loop. The data is fetched through the
+        asynchronous variants of the data sources, so summaries of many tickers can be fetched concurrently, e.g. with
+        asyncio.gather. Requires the async extra
+
+        :param kwargs optional parameters that can be passed. Same as :py:meth:get_summary
+        :return: ticker summary
+        """
+        local_datasource = self.__get_local_datasource(**kwargs)
+        function = Ticker.__summary_function(local_datasource, kwargs)
+        try:
+            response = await Ticker.__create_async_datasource(local_datasource).call_api(function, self.symbol,
+                                                                                         **kwargs)
+        except ds.HTTP_ERRORS as e:
+            Ticker.__log_request_error(e)
+            response = await self.__handle_fallback_request_async(function, **kwargs)
 
-        return self.__handle_request(local_datasource, CC.STOCK_SUMMARY, **kwargs)
+        fall_back, data = self.__process_response(local_datasource, response, function)
+        return await self.__handle_fallback_request_async(function, **kwargs) if fall_back else data
 
     def get_historical_data(self):
         pass
@@ -96,21 +128,34 @@ class Ticker:
         """
         try:
             response = local_datasource.call_api(function, self.symbol, **kwargs)
-        except requests.exceptions.RequestException as e:
-            log.error(f"Error occurred while attempting to fetch data. HTTP Status = {e.response.status_code},"
-                      f"Message = {e.response.text}")
+        except ds.HTTP_ERRORS as e:
+            Ticker.__log_request_error(e)
             response = self.__handle_fallback_request(function, **kwargs)
 
-        if isinstance(response, requests.models.Response):
-            if response.status_code is not requests.codes.ok:
-                is_fallback = Ticker.__is_fallback(local_datasource, response)
-                if is_fallback:
-                    return self.__handle_fallback_request(function, **kwargs)
-                else:
-                    raise MarketDataException(f"Unrecoverable error occurred while attempting to fetch {self.symbol} "
-                                              f"{function}. HTTP ERROR: {response.status_code}, {response.content}")
-            return response.json()
-        return response
+        fall_back, data = self.__process_response(local_datasource, response, function)
+        return self.__handle_fallback_request(function, **kwargs) if fall_back else data
+
+    def __process_response(self, local_datasource, response, function):
+        """
+        Decodes the received data, or decides whether the request should be sent again using the fallback data source
+        if it failed. The response type is only checked once on the successful path
+
+        :param local_datasource: data source the request was sent with
+        :param response: received response, or data returned by a library data source
+        :param function: function/endpoint/data which was retrieved
+        :return: tuple of whether the data should be fetched again using the fallback data source and the decoded data
+        :rtype: tuple
+        :raises MarketDataException when the request failed with an error which cannot be recovered with the fallback
+                data source
+        """
+        if not isinstance(response, ds.HTTP_RESPONSE_TYPES):
+            return False, response
+        if response.status_code == requests.codes.ok:
+            return False, util.json_loads(response.content)
+        if Ticker.__is_fallback(local_datasource, response):
+            return True, None
+        raise MarketDataException(f"Unrecoverable error occurred while attempting to fetch {self.symbol} "
+                                  f"{function}. HTTP ERROR: {response.status_code}, {response.content}")
 
     def __handle_fallback_request(self, function, **kwargs):
         """
@@ -119,17 +164,72 @@ class Ticker:
         :param function: function/endpoint/data to retrieve. E.g. summary, balance_sheet
         :type str
         :param kwargs: any other data source related parameters
-        :return:
+        :return: decoded data if the fallback data source responded successfully over HTTP, or else the response
         :raises MarketDataException when error occurred while trying to fetch data through fallback datasource
         """
         try:
-            return self.__fallback_datasource.call_api(function, self.symbol, **kwargs)
-        except IOError as e:
+            response = self.__fallback_datasource.call_api(function, self.symbol, **kwargs)
+        except _FALLBACK_ERRORS as e:
             raise MarketDataException("Error occurred while fetching data", e)
+        return Ticker.__decode(response)
+
+    async def __handle_fallback_request_async(self, function, **kwargs):
+        """
+        Retries to fetch the data again using the asynchronous variant of the fall back data source
+
+        :param function: function/endpoint/data to retrieve. E.g. summary, balance_sheet
+        :type str
+        :param kwargs: any other data source related parameters
+        :return: decoded data if the fallback data source responded successfully over HTTP, or else the response
+        :raises MarketDataException when error occurred while trying to fetch data through fallback datasource
+        """
+        try:
+            response = await Ticker.__create_async_datasource(self.__fallback_datasource).call_api(function,
+                                                                                               self.symbol, **kwargs)
+        except _FALLBACK_ERRORS as e:
+            raise MarketDataException("Error occurred while fetching data", e)
+        return Ticker.__decode(response)
 
     def __get_local_datasource(self, **kwargs):
+        """
+        Gets the data source to send the request with. Data sources the ticker already holds are reused instead of
+        looking them up again
+
+        :param kwargs: request parameters
+        :return: the data source given with the request or else the data source of the ticker
+        """
         datasource = kwargs.get(DC.DATASOURCE)
-        return self.__datasource if datasource is None else Ticker.__create_datasource(datasource)
+        if datasource is None or datasource == self.__datasource.name:
+            return self.__datasource
+        if datasource == self.__fallback_datasource.name:
+            return self.__fallback_datasource
+        return Ticker.__create_datasource(datasource)
+
+    @staticmethod
+    def __summary_function(datasource, kwargs):
+        if isinstance(datasource, ds.IEXCloud) and kwargs.get("advanced-stats") is True:
+            return CC.SUMMARY_ADVANCED
+        return CC.STOCK_SUMMARY
+
+    @staticmethod
+    def __decode(response):
+        """
+        Decodes the data of a successful HTTP response
+
+        :param response: received response, or data returned by a library data source
+        :return: decoded data, or the response itself if it is not a successful HTTP response
+        """
+        if isinstance(response, ds.HTTP_RESPONSE_TYPES) and response.status_code == requests.codes.ok:
+            return util.json_loads(response.content)
+        return response
+
+    @staticmethod
+    def __log_request_error(e):
+        if getattr(e, "response", None) is not None:
+            log.error("Error occurred while attempting to fetch data. HTTP Status = %s,Message = %s",
+                      e.response.status_code, e.response.text)
+        else:
+            log.error("Error occurred while attempting to fetch data. Error = %s", e)
 
     @staticmethod
     def __is_fallback(datasource, response):
@@ -141,8 +241,9 @@ class Ticker:
         :return: :bool of whether to try again
         """
         if datasource.is_fallback_code(response):
-            log.warning(f"Response returned with status: {response.status_code}, msg: {response.text} and "
-                        f"retrying again with fallback data source")
+            if log.isEnabledFor(logging.WARNING):
+                log.warning("Response returned with status: %s, msg: %s and retrying again with fallback data source",
+                            response.status_code, response.text)
             return True
         else:
             return False
@@ -156,3 +257,15 @@ class Ticker:
         :return: instance of :py:class:ds.DataSource
         """
         return ds.create_datasource(datasource)
+
+    @staticmethod
+    def __create_async_datasource(datasource):
+        """
+        Gets the asynchronous variant of a data source. The variant is kept for as long as the data source is
+        referenced, so that its pooled connections are reused between calls
+
+        :param datasource: data source
+        :return: instance of :py:class:adatasource.AsyncDataSource
+        """
+        from . import adatasource
+        return adatasource.async_variant(datasource)
@@ -12,13 +12,39 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
+import json
+import os
+import time
 from pathlib import Path
+from threading import Lock
 from collections import OrderedDict
-from datetime import datetime, timedelta
 
 import yaml
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # libyaml bindings parse several times faster than the pure python loader
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 __APP_CONFIG = None
+_DEFAULT_CONFIG_PATH = Path(__file__).resolve().parent.parent.joinpath('conf', 'config.yaml').resolve()
+# Parsed config files by path, along with the modification time and the size of the file when it was parsed
+__CONFIG_FILES = {}
+# Guards the global app config and the parsed config files
+__CONFIG_LOCK = Lock()
+
+# Expiry of cached items without a ttl
+_NO_EXPIRY = float("inf")
+
+# Deserializes JSON documents from str or bytes, with orjson when it is installed as it decodes several times faster
+json_loads = orjson.loads if orjson is not None else json.loads
 
 
 def read_app_config(path: str = None, override_config: bool = True):
@@ -26,8 +52,10 @@ def read_app_config(path: str = None, override_config: bool = True):
     Read the app config from the config location
 
     :param path: absolute path or relative path from current working directory to the config file
-    :param override_config: whether to override the global app config
-    :return: config dictionary
+    :param override_config: whether to override the global app config. The global app config is returned without
+                            reading the file when set to false, and set from the file if it has not been read yet
+    :return: config dictionary. Every read returns a new dictionary, so that data sources which resolve values into
+             their config are initialized again
     :rtype: dict
     """
     global __APP_CONFIG
@@ -35,32 +63,60 @@ def read_app_config(path: str = None, override_config: bool = True):
     if not override_config and __APP_CONFIG is not None:
         return __APP_CONFIG
 
-    if not (path and Path(path).exists()):
-        path = Path(__file__).resolve().parent.parent.joinpath('conf', 'config.yaml').resolve()
+    with __CONFIG_LOCK:
+        # Checked again as another thread may have set the global app config while waiting for the lock
+        if not override_config and __APP_CONFIG is not None:
+            return __APP_CONFIG
 
-    with open(path) as f:
-        config = yaml.load(f, Loader=yaml.FullLoader)
+        if not (path and Path(path).exists()):
+            path = _DEFAULT_CONFIG_PATH
 
-    if override_config:
-        __APP_CONFIG = config
+        config = _load_config_file(path)
 
-    return config
+        if override_config or __APP_CONFIG is None:
+            __APP_CONFIG = config
+
+        return config
+
+
+def _load_config_file(path):
+    """
+    Parses a config file. A file is only parsed again once it has been modified since it was last parsed. The parsed
+    config is kept unmodified and a copy of it is returned, as data sources rewrite parts of their config
+
+    :param path: path to the config file
+    :return: config dictionary
+    :rtype: dict
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+
+    parsed = __CONFIG_FILES.get(path)
+    if parsed is None or parsed[0] != version:
+        with open(path, "rb") as f:
+            parsed = (version, yaml.load(f, Loader=_YamlLoader))
+        __CONFIG_FILES[path] = parsed
+    return copy.deepcopy(parsed[1])
 
 
 class LRUCache(object):
     """
-    LRU Cache with TTL support
+    LRU Cache with TTL support. Cache operations are thread safe
     """
+    __slots__ = ("__cache", "__capacity", "__ttl", "__lock")
+
     def __init__(self, capacity: int = 50, ttl: int = 900):
         """
         Initializes a cache object
 
         :param capacity: cache capacity. default 50
-        :param ttl: expiry period. default 900s
+        :param ttl: expiry period. default 900s. None keeps items until they are evicted
         """
         self.__cache = OrderedDict()
         self.__capacity = capacity
         self.__ttl = ttl
+        self.__lock = Lock()
 
     @property
     def capacity(self):
@@ -79,9 +135,9 @@ class LRUCache(object):
         self.__ttl = ttl
 
     def __contains__(self, key):
-        if key in self.__cache and self.__cache[key] is not None and self.__cache[key]["expiry"] > datetime.now():
-            return True
-        return False
+        with self.__lock:
+            entry = self.__cache.get(key)
+            return entry is not None and entry[1] > time.monotonic()
 
     def get(self, key):
         """
@@ -90,14 +146,35 @@ class LRUCache(object):
         :param key: cache key
         :return: item if exists and not expired
         """
-        if key in self.__cache:
-            self.__cache.move_to_end(key)
-            cache_val = self.__cache[key]
-            if cache_val["expiry"] < datetime.now():
+        with self.__lock:
+            entry = self.__cache.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
                 del self.__cache[key]
-            else:
-                return cache_val["value"]
-        return None
+                return None
+            self.__cache.move_to_end(key)
+            return entry[0]
+
+    def get_or_create(self, key, factory, ttl: int = -1):
+        """
+        Retrieves an item from cache, or creates and puts it in to cache if it does not exist or has expired. The item
+        is created while holding the cache lock, so concurrent callers get the same item
+
+        :param key: cache key
+        :param factory: function which creates the item from the key
+        :param ttl: optional ttl value to override default ttl value. None keeps the item until it is evicted
+        :return: cached or created item
+        """
+        with self.__lock:
+            entry = self.__cache.get(key)
+            if entry is not None and entry[1] >= time.monotonic():
+                self.__cache.move_to_end(key)
+                return entry[0]
+
+            value = factory(key)
+            self.__put(key, value, ttl)
+            return value
 
     def put(self, key, value, ttl: int = -1):
         """
@@ -105,18 +182,18 @@ class LRUCache(object):
 
         :param key: cache key
         :param value: value
-        :param ttl: optional ttl value to override default ttl value
+        :param ttl: optional ttl value to override default ttl value. None keeps the item until it is evicted
         """
-        if ttl != -1:
-            ttl = self.__ttl
+        with self.__lock:
+            self.__put(key, value, ttl)
 
-        expires = datetime.now() + timedelta(seconds=ttl)
+    def __put(self, key, value, ttl):
+        if ttl == -1:
+            ttl = self.__ttl
 
-        cache_val = {
-            "value": value,
-            "expiry": expires
-        }
-        self.__cache[key] = cache_val
+        # Entries are (value, expiry) tuples. Expiry is measured on the monotonic clock so it is not affected by system
+        # clock changes. Items without a ttl never expire
+        self.__cache[key] = (value, _NO_EXPIRY if ttl is None else time.monotonic() + ttl)
         self.__cache.move_to_end(key)
 
         if len(self.__cache) > self.capacity:
@@ -159,6 +236,28 @@ class DataSourceConstants(object):
 
     CACHE_EXPIRY: str = "cacheExpiry"
 
+    CACHE_TTL: str = "cacheTtl"
+
+    HTTP_TIMEOUT: str = "timeout"
+
+    RETRY_COUNT: str = "retryCount"
+
+    RETRY_DELAY: str = "retryDelay"
+
+    POOL_SIZE: str = "poolSize"
+
+    CONCURRENCY: str = "concurrency"
+
+    HTTP_BACKEND: str = "httpBackend"
+
+    HTTP2: str = "http2"
+
+    RATE_LIMIT: str = "rateLimit"
+
+    RATE_LIMIT_REQUESTS: str = "requests"
+
+    RATE_LIMIT_PERIOD: str = "period"
+
 
 class CommonConstants(object):
 
@@ -173,3 +272,7 @@ class CommonConstants(object):
     TOKEN: str = "token"
 
     SYMBOL: str = "symbol"
+
+    FUNCTION: str = "function"
+
+    FORCE_REFRESH: str = "force_refresh"
@@ -39,9 +39,19 @@ setup(
     install_requires=[
         "pyyaml~=5.4.1",
         "requests~=2.25.1",
+        "urllib3>=1.26",
         "yfinance>=0.1.55"
     ],
     extras_require={
+        "async": [
+            "httpx"
+        ],
+        "http2": [
+            "httpx[http2]"
+        ],
+        "json": [
+            "orjson"
+        ],
         "test": [
             "pytest",
             "pytest-mock"
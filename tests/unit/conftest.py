@@ -0,0 +1,45 @@
+# Copyright (c) 2021, Madawa Soysa
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+from pathlib import Path
+
+import pytest
+import yaml
+
+
+@pytest.fixture(scope="session")
+def test_app_config():
+    """
+    Reads the test app config once per test session
+    """
+    conf_file_path = Path(__file__).resolve().parent.parent.joinpath("resources", "test_conf.yaml")
+    with open(conf_file_path, "rb") as f:
+        return yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+
+@pytest.fixture
+def test_config(test_app_config):
+    """
+    Copy of the test app config, so changes made by a test do not leak into others
+    """
+    return copy.deepcopy(test_app_config)
+
+
+@pytest.fixture
+def mock_ds_app_config(mocker, test_config):
+    """
+    Mocks the app configuration from datasource module
+    """
+    yield mocker.patch("marketdata.datasource.util.read_app_config", return_value=test_config, autospec=True)
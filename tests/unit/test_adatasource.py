@@ -0,0 +1,162 @@
+# Copyright (c) 2021, Madawa Soysa
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import copy
+import threading
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from marketdata import adatasource as ads  # noqa: E402
+from marketdata import datasource as ds  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def mock_app_config(mock_ds_app_config):
+    """
+    Mocks the app configuration
+    """
+    yield mock_ds_app_config
+
+
+def test_create_async_ds():
+    """
+    Tests creating asynchronous data sources of the configured data source types
+    """
+    assert isinstance(ads.create_async_datasource("IEXCloud"), ads.AsyncIEXCloud)
+    assert isinstance(ads.create_async_datasource("AlphaVantage"), ads.AsyncAlphaVantage)
+    assert isinstance(ads.create_async_datasource("YahooFinance"), ads.AsyncYahooFinance)
+    datasource = ads.create_async_datasource("SampleDataSource1")
+    assert type(datasource) is ads.AsyncDataSource
+
+    with pytest.raises(ValueError):
+        ads.create_async_datasource("XXX")
+
+
+def test_async_call_api_batch(mocker):
+    """
+    Tests fetching data for multiple symbols concurrently through the async client
+    """
+    async def mock_get(client, url, params=None, headers=None):
+        return httpx.Response(200, json={"url": url, "token": client.params["token"]})
+
+    mock = mocker.patch.object(httpx.AsyncClient, "get", side_effect=mock_get, autospec=True)
+    datasource = ads.create_async_datasource("IEXCloud")
+
+    async def fetch():
+        async with datasource:
+            responses = await datasource.call_api_batch("summary", ["SMBL", "XMPL"])
+            cached = await datasource.call_api("summary", "SMBL")
+            return responses, cached
+
+    responses, cached = asyncio.run(fetch())
+    assert list(responses) == ["SMBL", "XMPL"]
+    assert responses["XMPL"].json() == {"url": "https://sandbox.iex.com/stable/stock/XMPL/stats",
+                                        "token": "Tsk_sandbox"}
+    assert cached is responses["SMBL"], "Successful responses should be served from the response cache"
+    assert mock.call_count == 2
+    assert datasource._client is None, "Client should be closed when leaving the context"
+
+
+def test_async_ds_rejects_sync_context():
+    """
+    Tests that the asynchronous data source cannot be used as a synchronous context manager
+    """
+    datasource = ads.create_async_datasource("IEXCloud")
+    with pytest.raises(TypeError, match="async with"):
+        with datasource:
+            pass
+
+
+def test_async_variant_rebuilt_on_config_reload(mock_ds_app_config, test_config):
+    """
+    Tests that the asynchronous variant is created again when the synchronous data source is initialized again with a
+    reloaded config
+    """
+    iex = ds.create_datasource("IEXCloud")
+    variant = ads.async_variant(iex)
+    assert ads.async_variant(iex) is variant
+    assert variant._default_params["token"] == "Tsk_sandbox"
+
+    reloaded = copy.deepcopy(test_config)
+    iex_config = next(c for c in reloaded[ds.DC.DATA_SOURCES_PARENT] if c[ds.DC.NAME] == "IEXCloud")
+    iex_config[ds.DC.AUTH_TOKEN]["sandbox"] = "Tsk_reloaded"
+    mock_ds_app_config.return_value = reloaded
+    assert ds.create_datasource("IEXCloud") is iex
+    variant = ads.async_variant(iex)
+    assert variant._is_initialized(iex._config)
+    assert variant._default_params["token"] == "Tsk_reloaded"
+    iex.close()
+
+
+def test_async_client_released_on_loop_change(mocker):
+    """
+    Tests that the client of the previous event loop is closed on that loop when the data source is used from another
+    event loop, while the previous event loop is still running
+    """
+    async def mock_get(client, url, params=None, headers=None):
+        return httpx.Response(200, json={"url": url})
+
+    mocker.patch.object(httpx.AsyncClient, "get", side_effect=mock_get, autospec=True)
+    aclose = mocker.spy(httpx.AsyncClient, "aclose")
+    datasource = ads.create_async_datasource("IEXCloud")
+
+    async def fetch():
+        async with datasource:
+            return await datasource.call_api("summary", "SMBL", force_refresh=True)
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever)
+    thread.start()
+    try:
+        asyncio.run_coroutine_threadsafe(datasource.call_api("summary", "SMBL", force_refresh=True), loop).result(5)
+        client = datasource._client
+
+        asyncio.run(fetch())
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result(5)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+    assert client.is_closed, "Client of the previous event loop should be closed"
+    assert aclose.call_count == 2
+
+
+def test_async_client_dropped_when_loop_not_running(mocker):
+    """
+    Tests that no close is scheduled on the previous event loop when it is no longer running
+    """
+    async def mock_get(client, url, params=None, headers=None):
+        return httpx.Response(200, json={"url": url})
+
+    mocker.patch.object(httpx.AsyncClient, "get", side_effect=mock_get, autospec=True)
+    aclose = mocker.spy(httpx.AsyncClient, "aclose")
+    datasource = ads.create_async_datasource("IEXCloud")
+
+    async def fetch():
+        async with datasource:
+            return await datasource.call_api("summary", "SMBL", force_refresh=True)
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(datasource.call_api("summary", "SMBL", force_refresh=True))
+        client = datasource._client
+
+        asyncio.run(fetch())
+        assert not client.is_closed
+        assert aclose.call_count == 1, "Only the client of the running event loop should be closed"
+        loop.run_until_complete(client.aclose())
+    finally:
+        loop.close()
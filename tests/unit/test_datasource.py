@@ -11,10 +11,13 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import subprocess
+import sys
 from pathlib import Path
+from unittest.mock import Mock
 
 import pytest
-import yaml
+import requests
 
 from marketdata import datasource as ds
 from marketdata import util
@@ -24,15 +27,11 @@ DC = util.DataSourceConstants
 
 
 @pytest.fixture(autouse=True)
-def mock_app_config(mocker):
+def mock_app_config(mock_ds_app_config):
     """
     Mocks the app configuration
     """
-    conf_file_path = Path(__file__).resolve().parent.parent.joinpath("resources", "test_conf.yaml")
-    if Path(conf_file_path).exists():
-        with open(conf_file_path) as f:
-            config = yaml.load(f, Loader=yaml.FullLoader)
-    yield mocker.patch("marketdata.datasource.util.read_app_config", return_value=config, autospec=True)
+    yield mock_ds_app_config
 
 
 def test_init_generic_ds():
@@ -125,3 +124,362 @@ def test_init_ds_with_invalid_conf_type():
 
     with pytest.raises(DataSourceException, match=".*Configuration object is empty or not a required type*."):
         ds.DataSource("config")
+
+
+def test_ds_session(mocker):
+    """
+    Tests that the data source issues requests through a pooled session with retries configured
+    """
+    test_config = util.read_app_config()
+    data_source_list = test_config[DC.DATA_SOURCES_PARENT]
+    datasource = ds.DataSource(data_source_list[0])
+
+    adapter = datasource._session.get_adapter("https://generic.com")
+    assert adapter.max_retries.total == 3
+    assert 500 in adapter.max_retries.status_forcelist
+    assert adapter.max_retries.allowed_methods == {"GET"}
+    assert adapter.max_retries.respect_retry_after_header
+
+    mock_get = mocker.patch.object(requests.Session, "get", autospec=True)
+    datasource.call_api("summary", "SMBL")
+    datasource.call_api("summary", "XMPL")
+    assert mock_get.call_count == 2
+    assert mock_get.call_args[1]["url"] == "https://generic.com/summary/XMPL"
+    assert mock_get.call_args[1]["timeout"] == 10
+
+    mock_close = mocker.patch.object(requests.Session, "close", autospec=True)
+    with datasource as d:
+        assert d is datasource
+    mock_close.assert_called_once_with(datasource._session)
+
+
+def test_ds_httpx_session(mocker):
+    """
+    Tests that the data source sends requests through an httpx client when the httpx backend is configured
+    """
+    httpx = pytest.importorskip("httpx")
+    test_config = util.read_app_config()
+    config = dict(test_config[DC.DATA_SOURCES_PARENT][0], name="GenericHttpx", httpBackend="httpx", http2=False)
+    transport = mocker.spy(httpx.HTTPTransport, "__init__")
+    datasource = ds.DataSource(config)
+    assert isinstance(datasource._session, httpx.Client)
+    assert transport.call_args[1]["retries"] == 3
+
+    mock_get = mocker.patch.object(httpx.Client, "get", autospec=True,
+                                   return_value=httpx.Response(200, json={"symbol": "SMBL"}))
+    assert datasource.call_api("summary", "SMBL").json() == {"symbol": "SMBL"}
+    datasource.call_api("summary", "SMBL")
+    assert mock_get.call_count == 1
+    assert mock_get.call_args[1]["url"] == "https://generic.com/summary/SMBL"
+    datasource.close()
+
+
+def test_ds_response_cache(mocker):
+    """
+    Tests that successful responses are served from the response cache until a refresh is forced
+    """
+    test_config = util.read_app_config()
+    data_source_list = test_config[DC.DATA_SOURCES_PARENT]
+    datasource = ds.DataSource(data_source_list[0])
+
+    mock_get = mocker.patch.object(requests.Session, "get", autospec=True)
+    mock_get.return_value.ok = True
+
+    first = datasource.call_api("summary", "SMBL")
+    assert datasource.call_api("summary", "SMBL") is first
+    assert mock_get.call_count == 1
+
+    datasource.call_api("summary", "XMPL")
+    assert mock_get.call_count == 2
+
+    datasource.call_api("summary", "SMBL", force_refresh=True)
+    assert mock_get.call_count == 3
+
+    mock_get.return_value.ok = False
+    datasource.call_api("summary", "FAIL")
+    datasource.call_api("summary", "FAIL")
+    assert mock_get.call_count == 5, "Unsuccessful responses should not be cached"
+
+    mock_get.return_value.ok = True
+    uncached = ds.DataSource(dict(data_source_list[0], name="GenericUncached", cacheTtl={"summary": 0}))
+    uncached.call_api("summary", "SMBL")
+    uncached.call_api("summary", "SMBL")
+    assert mock_get.call_count == 7, "Responses of functions with a ttl of 0 should not be cached"
+
+
+def test_ds_conditional_request(mocker):
+    """
+    Tests that expired responses are revalidated with their ETag and reused when the provider reports no changes
+    """
+    test_config = util.read_app_config()
+    config = dict(test_config[DC.DATA_SOURCES_PARENT][0], name="GenericConditional", cacheTtl={"summary": 0})
+    datasource = ds.DataSource(config)
+
+    fresh = Mock(ok=True, status_code=200, headers={"ETag": '"v1"'})
+    mock_get = mocker.patch.object(requests.Session, "get", autospec=True,
+                                   side_effect=[fresh, Mock(ok=False, status_code=304, headers={})])
+    assert datasource.call_api("summary", "SMBL") is fresh
+    assert mock_get.call_args[1]["headers"] is None
+
+    assert datasource.call_api("summary", "SMBL") is fresh, "Not modified responses should reuse the last response"
+    assert mock_get.call_args[1]["headers"] == {"If-None-Match": '"v1"'}
+
+
+def test_iex_cloud_call_api(mocker):
+    """
+    Tests the url and auth token used by IEXCloud for the default and overridden environments
+    """
+    datasource = ds.create_datasource("IEXCloud")
+    assert isinstance(datasource, ds.IEXCloud)
+    mock_get = mocker.patch.object(requests.Session, "get", autospec=True)
+
+    assert datasource._session.params == {"token": "Tsk_sandbox"}
+
+    datasource.call_api("summary", "SMBL")
+    assert mock_get.call_args[1]["url"] == "https://sandbox.iex.com/stable/stock/SMBL/stats"
+    assert mock_get.call_args[1]["params"] is None, "Default token should be sent with the session parameters"
+
+    datasource.call_api("summary", "SMBL", environment="production")
+    assert mock_get.call_args[1]["url"] == "https://cloud.iex.com/stable/stock/SMBL/stats"
+    assert mock_get.call_args[1]["params"]["token"] == "pk_production"
+
+    params = {"filter": "peRatio"}
+    datasource.call_api("summary", "SMBL", version="v1", token="override", params=params)
+    assert mock_get.call_args[1]["url"] == "https://sandbox.iex.com/v1/stock/SMBL/stats"
+    assert mock_get.call_args[1]["params"] == {"filter": "peRatio", "token": "override"}
+    assert params == {"filter": "peRatio"}, "Request parameters of the caller should not be modified"
+
+
+def test_av_call_api(mocker):
+    """
+    Tests the query parameters used by AlphaVantage to invoke a function
+    """
+    datasource = ds.create_datasource("AlphaVantage")
+    assert isinstance(datasource, ds.AlphaVantage)
+    mock_get = mocker.patch.object(requests.Session, "get", autospec=True)
+
+    datasource.call_api("summary", "SMBL")
+    assert mock_get.call_args[1]["url"] == "https://www.av.com/query"
+    assert mock_get.call_args[1]["params"] == {"function": "OVERVIEW", "symbol": "SMBL"}
+    assert datasource._session.params == {"apikey": "AV_TOKEN"}
+
+    datasource.call_api("summary", "SMBL", apikey="override")
+    assert mock_get.call_args[1]["params"] == {"function": "OVERVIEW", "symbol": "SMBL", "apikey": "override"}
+
+    with pytest.raises(ValueError, match=r".*Symbol and Function are required parameters*."):
+        datasource.call_api("summary", None)
+
+
+def test_compile_resource():
+    """
+    Tests formatting resources of symbols from the resource templates
+    """
+    assert ds.DataSource._compile_resource("/stock/{}/stats")("SMBL") == "/stock/SMBL/stats"
+    assert ds.DataSource._compile_resource("/summary/{0}?q={0}")("SMBL") == "/summary/SMBL?q=SMBL"
+    assert ds.DataSource._compile_resource("/summary/{}?pct=100%")("SMBL") == "/summary/SMBL?pct=100%"
+    assert ds.DataSource._compile_resource("OVERVIEW")("SMBL") == "OVERVIEW"
+
+
+def test_is_fallback_code():
+    """
+    Tests checking HTTP status codes against the fallback codes of the data source
+    """
+    test_config = util.read_app_config()
+    data_source_list = test_config[DC.DATA_SOURCES_PARENT]
+    datasource = ds.DataSource(data_source_list[0])
+    assert datasource.is_fallback_code(Mock(status_code=403))
+    assert not datasource.is_fallback_code(Mock(status_code=404))
+
+    datasource = ds.DataSource(data_source_list[2])
+    assert not datasource.is_fallback_code(Mock(status_code=500)), "Data source without fallback codes should not " \
+                                                                    "fall back"
+
+
+def test_call_api_batch(mocker):
+    """
+    Tests fetching data for multiple symbols through a single batch call
+    """
+    datasource = ds.create_datasource("IEXCloud")
+    mock_get = mocker.patch.object(requests.Session, "get", autospec=True)
+    mock_get.side_effect = lambda session, url, **kwargs: Mock(ok=False, url=url)
+
+    responses = datasource.call_api_batch("summary", ["SMBL", "XMPL", "SMBL", "TEST"], max_workers=2)
+    assert list(responses) == ["SMBL", "XMPL", "TEST"]
+    assert mock_get.call_count == 3
+    assert responses["XMPL"].url == "https://sandbox.iex.com/stable/stock/XMPL/stats"
+    assert datasource.call_api_batch("summary", []) == {}
+
+
+def test_ds_rate_limit(mocker):
+    """
+    Tests that requests sent to the backend are rate limited while cached responses are not
+    """
+    test_config = util.read_app_config()
+    datasource_config = dict(test_config[DC.DATA_SOURCES_PARENT][0], rateLimit={"requests": 5, "period": 60})
+    datasource = ds.DataSource(datasource_config)
+    assert datasource._limiter.rate == pytest.approx(5 / 60)
+
+    mocker.patch.object(requests.Session, "get", autospec=True).return_value.ok = True
+    acquire = mocker.patch.object(ds.TokenBucket, "acquire", autospec=True)
+    datasource.call_api("summary", "SMBL")
+    datasource.call_api("summary", "SMBL")
+    assert acquire.call_count == 1
+
+
+@pytest.mark.parametrize("rate_limit", [5, {"period": 60}, {"requests": "5"}, {"requests": 0},
+                                        {"requests": 5, "period": -1}])
+def test_ds_invalid_rate_limit(rate_limit):
+    """
+    Tests that an invalid rate limit fails the data source initialization
+    """
+    test_config = util.read_app_config()
+    datasource_config = dict(test_config[DC.DATA_SOURCES_PARENT][0], rateLimit=rate_limit)
+    with pytest.raises(DataSourceException, match="Rate limit"):
+        ds.DataSource(datasource_config)
+
+
+def test_create_ds_after_config_reload(mock_app_config):
+    """
+    Tests that data sources added to a reloaded app config can be created
+    """
+    test_config = util.read_app_config()
+    with pytest.raises(ValueError):
+        ds.create_datasource("ReloadedDataSource")
+
+    reloaded_config = dict(test_config)
+    reloaded_config[DC.DATA_SOURCES_PARENT] = test_config[DC.DATA_SOURCES_PARENT] + [
+        {"name": "ReloadedDataSource", "type": "DataSource", "isLibrary": True, "isAuthenticated": False}]
+    mock_app_config.return_value = reloaded_config
+
+    datasource = ds.create_datasource("ReloadedDataSource")
+    assert datasource.name == "ReloadedDataSource"
+
+
+def test_init_shared_ds_once(mocker):
+    """
+    Tests that a shared data source validates its config again only when it is constructed with a different config
+    """
+    test_config = util.read_app_config()
+    iex_config = next(c for c in test_config[DC.DATA_SOURCES_PARENT] if c[DC.NAME] == "IEXCloud")
+    validate = mocker.spy(ds.IEXCloud, "_validate_config")
+
+    datasource = ds.IEXCloud(iex_config)
+    assert ds.IEXCloud(iex_config) is datasource
+    assert validate.call_count == 1
+
+    session = datasource._session
+    close = mocker.spy(session, "close")
+    assert ds.IEXCloud(dict(iex_config)) is datasource
+    assert validate.call_count == 2, "Reloaded configs should be validated"
+    assert close.call_count == 1, "The session of the previous config should be closed"
+    assert datasource._session is not session
+
+
+def test_create_ds_of_unknown_type(mock_app_config):
+    """
+    Tests that data sources of types which are not registered are created as generic data sources
+    """
+    test_config = util.read_app_config()
+    reloaded_config = dict(test_config)
+    reloaded_config[DC.DATA_SOURCES_PARENT] = test_config[DC.DATA_SOURCES_PARENT] + [
+        {"name": "UnknownTypeDataSource", "type": "create_datasource", "isLibrary": True, "isAuthenticated": False}]
+    mock_app_config.return_value = reloaded_config
+
+    assert type(ds.create_datasource("UnknownTypeDataSource")) is ds.DataSource
+
+
+def test_init_ds_with_env_token(monkeypatch):
+    """
+    Tests resolving the authentication token of a data source from an environment variable
+    """
+    test_config = util.read_app_config()
+    datasource_config = dict(test_config[DC.DATA_SOURCES_PARENT][0], authToken="env.MD_TEST_TOKEN")
+    monkeypatch.delenv("MD_TEST_TOKEN", raising=False)
+    with pytest.raises(DataSourceException, match=r".*Auth token cannot be found in MD_TEST_TOKEN environment "
+                                                  r"variable*."):
+        ds.DataSource(dict(datasource_config))
+
+    monkeypatch.setenv("MD_TEST_TOKEN", "env_token")
+    datasource = ds.DataSource(datasource_config)
+    assert datasource._auth_token == "env_token"
+
+
+def test_init_iex_cloud_tokens(monkeypatch):
+    """
+    Tests resolving the IEX Cloud auth tokens of the environments and skipping missing tokens, except the token of
+    the default environment
+    """
+    test_config = util.read_app_config()
+    iex_config = next(c for c in test_config[DC.DATA_SOURCES_PARENT] if c[DC.NAME] == "IEXCloud")
+    monkeypatch.setenv("MD_IEX_PROD_TOKEN", "pk_env")
+    monkeypatch.delenv("MD_IEX_SANDBOX_TOKEN", raising=False)
+    auth_token = {"sandbox": "env.MD_IEX_SANDBOX_TOKEN", "production": "env.MD_IEX_PROD_TOKEN"}
+    datasource = ds.IEXCloud(dict(iex_config, name="IEXCloudEnvTokens", environment="production",
+                                  authToken=auth_token))
+    assert datasource._auth_token == {"production": "pk_env"}
+
+    with pytest.raises(DataSourceException, match=r".*Authentication token is not provided for none of the "
+                                                  r"environments*."):
+        ds.IEXCloud(dict(iex_config, name="IEXCloudNoTokens", authToken={"sandbox": "", "production": None}))
+
+    with pytest.raises(DataSourceException, match=r".*Authentication token is not provided for the sandbox "
+                                                  r"environment*."):
+        ds.IEXCloud(dict(iex_config, name="IEXCloudNoDefaultToken", environment="sandbox", authToken=auth_token))
+
+
+def test_init_iex_cloud_without_base_url():
+    """
+    Tests creating an IEXCloud data source without base urls for the environments
+    """
+    test_config = util.read_app_config()
+    iex_config = next(c for c in test_config[DC.DATA_SOURCES_PARENT] if c[DC.NAME] == "IEXCloud")
+    with pytest.raises(DataSourceException, match=r".*IEX Cloud API base url is required*."):
+        ds.IEXCloud(dict(iex_config, baseUrl="https://sandbox.iex.com"))
+
+
+def test_yf_lazy_import():
+    """
+    Tests that importing the data sources does not import yfinance until a Yahoo Finance data source is created
+    """
+    code = "import sys, marketdata.datasource; assert 'yfinance' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).resolve().parents[2])
+
+
+def test_yf_call_api(mocker):
+    """
+    Tests invoking the yfinance Ticker function mapped to a resource
+    """
+    yf = pytest.importorskip("yfinance")
+    get_info = mocker.patch.object(yf.Ticker, "get_info", autospec=True, return_value={"symbol": "SMBL"})
+    datasource = ds.create_datasource("YahooFinance")
+    assert datasource.call_api("summary", "SMBL", force_refresh=True) == {"symbol": "SMBL"}
+    assert datasource.call_api("summary", "SMBL") == {"symbol": "SMBL"}
+    assert get_info.call_count == 1, "Data should be served from the response cache"
+
+    test_config = util.read_app_config()
+    yf_config = next(c for c in test_config[DC.DATA_SOURCES_PARENT] if c[DC.NAME] == "YahooFinance")
+    with pytest.raises(DataSourceException, match=r".*summary is mapped to get_quote_table which is not a yfinance "
+                                                  r"Ticker function*."):
+        ds.YahooFinance(dict(yf_config, resourceMapping={"summary": "get_quote_table"}))
+
+
+def test_av_rotate_tokens(mocker):
+    """
+    Tests switching to the next auth token when the provider rate limits the current token
+    """
+    test_config = util.read_app_config()
+    av_config = next(c for c in test_config[DC.DATA_SOURCES_PARENT] if c[DC.NAME] == "AlphaVantage")
+    datasource = ds.AlphaVantage(dict(av_config, authToken=["AV_TOKEN_1", "AV_TOKEN_2"],
+                                      rateLimit={"requests": 5, "period": 60}))
+    assert datasource._session.params == {"apikey": "AV_TOKEN_1"}
+    assert 429 not in datasource._session.get_adapter("https://www.av.com").max_retries.status_forcelist
+
+    mock_get = mocker.patch.object(requests.Session, "get", autospec=True)
+    mock_get.side_effect = [Mock(status_code=429, ok=False), Mock(status_code=200, ok=True)]
+    limiter = datasource._limiter
+
+    response = datasource.call_api("summary", "SMBL")
+    assert response.status_code == 200
+    assert mock_get.call_count == 2
+    assert datasource._session.params == {"apikey": "AV_TOKEN_2"}
+    assert datasource._limiter is not limiter, "Each token should have its own rate limiter"
@@ -0,0 +1,28 @@
+# Copyright (c) 2021, Madawa Soysa
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from marketdata.exceptions import DataSourceException, MarketDataException
+
+
+def test_exception_args():
+    """
+    Tests that the message and the extra arguments of the exceptions are kept as flat args
+    """
+    cause = IOError("connection reset")
+    e = MarketDataException("Error occurred while fetching data", cause)
+    assert e.args == ("Error occurred while fetching data", cause)
+
+    e = DataSourceException("Configuration validation failed", cause)
+    assert e.args == ("Configuration validation failed", cause)
+    assert str(e) == "Configuration validation failed"
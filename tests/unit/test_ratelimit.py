@@ -0,0 +1,60 @@
+# Copyright (c) 2021, Madawa Soysa
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from marketdata.ratelimit import TokenBucket
+
+
+@pytest.fixture
+def mock_clock(mocker):
+    """
+    Mocks the monotonic clock and sleep used by the rate limiter
+    """
+    clock = mocker.patch("marketdata.ratelimit.time.monotonic", return_value=100.0)
+    sleep = mocker.patch("marketdata.ratelimit.time.sleep")
+    yield clock, sleep
+
+
+def test_token_bucket_burst(mock_clock):
+    """
+    Tests that requests up to the bucket capacity are allowed without waiting
+    """
+    clock, sleep = mock_clock
+    bucket = TokenBucket(rate=5 / 60, capacity=5)
+    for _ in range(5):
+        bucket.acquire()
+    sleep.assert_not_called()
+
+    bucket.acquire()
+    sleep.assert_called_once_with(pytest.approx(12))
+
+
+def test_token_bucket_refill(mock_clock):
+    """
+    Tests that tokens are refilled with time and queued callers wait behind each other
+    """
+    clock, sleep = mock_clock
+    bucket = TokenBucket(rate=2, capacity=2)
+    assert bucket.reserve(2) == 0
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1)
+
+    clock.return_value = 102.0
+    assert bucket.reserve() == 0, "Bucket should be refilled up to its capacity"
+
+
+def test_token_bucket_invalid():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0, capacity=1)
@@ -11,13 +11,19 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
+import json
+import subprocess
+import sys
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import patch, PropertyMock, Mock
 
 import pytest
-import yaml
+import requests
 
 from marketdata import datasource as ds
+from marketdata.exceptions import MarketDataException
 from marketdata.ticker import Ticker
 
 sample_response = {
@@ -40,34 +46,26 @@ sample_response = {
 }
 
 
-@pytest.fixture
-def test_config():
+@pytest.fixture(autouse=True)
+def mock_config(mocker, test_config):
     """
-    Reads test app config
+    Mocks the app configuration read by :py:class:Ticker
     """
-    conf_file_path = Path(__file__).resolve().parent.parent.joinpath("resources", "test_conf.yaml")
-    if Path(conf_file_path).exists():
-        with open(conf_file_path) as f:
-            return yaml.load(f, Loader=yaml.FullLoader)
+    yield mocker.patch.object(Ticker, "_CONFIG", new_callable=PropertyMock, return_value=test_config)
 
 
 @pytest.fixture
-def mock_ds_app_config(mocker, test_config):
+def tkr(mock_ds_app_config):
     """
-    Mocks the app configuration from datasource module
+    Ticker using the SampleDataSource2 data source and the default fallback data source
     """
-    yield mocker.patch("marketdata.datasource.util.read_app_config", return_value=test_config, autospec=True)
+    return Ticker(symbol="SMBL", datasource="SampleDataSource2")
 
 
-@patch.object(Ticker, "_CONFIG", new_callable=PropertyMock)
-@patch("marketdata.datasource.create_datasource", autospec=True)
-def test_ticker_initialization(mock_create_ds, mock_config, test_config):
-    mock_config.return_value = test_config
-    mocks = [Mock(), Mock(), Mock(), Mock()]
-    mocks[0].name = "Sample Data Source"
-    mocks[1].name = "Sample Fallback Datasource"
-    mocks[2].name = "DefaultDataSource"
-    mocks[3].name = "DefaultFallbackDataSource"
+@patch("marketdata.datasource.create_datasource")
+def test_ticker_initialization(mock_create_ds):
+    names = ("Sample Data Source", "Sample Fallback Datasource", "DefaultDataSource", "DefaultFallbackDataSource")
+    mocks = [SimpleNamespace(name=name) for name in names]
     mock_create_ds.side_effect = mocks
 
     ticker = Ticker("SMBL", datasource="SampleDS", fallback_datasource="SampleFbDs")
@@ -82,27 +80,19 @@ def test_ticker_initialization(mock_create_ds, mock_config, test_config):
     assert mock_create_ds.call_count == 4
 
 
-@patch.object(Ticker, "_CONFIG", new_callable=PropertyMock)
-@pytest.mark.usefixtures("mock_ds_app_config")
-def test_create_ticker(mock_config, test_config):
+def test_create_ticker(tkr):
     """
     Tests creating :py:class:Ticker instance
     """
-    mock_config.return_value = test_config
-    tkr = Ticker(symbol="SMBL", datasource="SampleDataSource2")
-
     assert tkr.symbol == "SMBL"
+    assert not hasattr(tkr, "__dict__")
     assert isinstance(tkr.datasource, ds.DataSource)
     assert tkr.datasource.name == "SampleDataSource2"
     assert isinstance(tkr.fallback_datasource, ds.YahooFinance)
     assert tkr.fallback_datasource.name == "YahooFinance"
 
 
-@patch.object(Ticker, "_CONFIG", new_callable=PropertyMock)
-@pytest.mark.usefixtures("mock_ds_app_config")
-def test_ticker_properties(mock_config, test_config):
-    mock_config.return_value = test_config
-    tkr = Ticker(symbol="SMBL", datasource="SampleDataSource2")
+def test_ticker_properties(tkr):
     assert tkr.datasource.name == "SampleDataSource2"
     tkr.datasource = "SampleDataSource1"
     assert tkr.datasource.name == "SampleDataSource1"
@@ -114,13 +104,9 @@ def test_ticker_properties(mock_config, test_config):
     assert isinstance(tkr2.fallback_datasource, ds.DataSource)
 
 
-@patch.object(Ticker, "_CONFIG", new_callable=PropertyMock)
-@patch("marketdata.datasource.create_datasource", return_value=Mock(), autospec=True)
-def test_ticker_summary_success(mock_create_ds, mock_config, test_config):
-    mock_config.return_value = test_config
-    response = Mock()
-    response.status_code = 200
-    response.json.return_value = sample_response
+@patch("marketdata.datasource.create_datasource", return_value=Mock())
+def test_ticker_summary_success(mock_create_ds):
+    response = SimpleNamespace(status_code=200, json=lambda: sample_response)
 
     datasource = mock_create_ds.return_value
     datasource.call_api.return_value = response
@@ -129,3 +115,105 @@ def test_ticker_summary_success(mock_create_ds, mock_config, test_config):
     summary = ticker.get_summary()
     assert summary.status_code == 200, "Response code should be successful"
     assert summary.json() == sample_response
+
+
+@patch("marketdata.datasource.create_datasource", return_value=Mock(), autospec=True)
+def test_ticker_summary_decodes_response(mock_create_ds):
+    response = requests.models.Response()
+    response.status_code = 200
+    response._content = json.dumps(sample_response).encode()
+    mock_create_ds.return_value.call_api.return_value = response
+
+    ticker = Ticker("SMBL", datasource="Sample Datasource")
+    assert ticker.get_summary() == sample_response
+
+
+@patch("marketdata.datasource.create_datasource", autospec=True)
+def test_ticker_summary_decodes_fallback_response(mock_create_ds):
+    failed = requests.models.Response()
+    failed.status_code = 429
+    response = requests.models.Response()
+    response.status_code = 200
+    response._content = json.dumps(sample_response).encode()
+    datasource, fallback_datasource = Mock(), Mock()
+    datasource.call_api.return_value = failed
+    datasource.is_fallback_code.return_value = True
+    fallback_datasource.call_api.return_value = response
+    mock_create_ds.side_effect = [datasource, fallback_datasource]
+
+    ticker = Ticker("SMBL", datasource="Sample Datasource", fallback_datasource="Fallback Datasource")
+    assert ticker.get_summary() == sample_response
+
+
+@pytest.mark.usefixtures("mock_ds_app_config")
+def test_ticker_summary_async(mocker):
+    """
+    Tests fetching summaries concurrently through the asynchronous data sources, falling back on failed requests
+    """
+    httpx = pytest.importorskip("httpx")
+    yf = pytest.importorskip("yfinance")
+
+    async def mock_get(client, url, params=None, headers=None):
+        if url.endswith("/FLBK"):
+            return httpx.Response(402, text="Payment required")
+        return httpx.Response(200, json={"url": url})
+
+    mocker.patch.object(httpx.AsyncClient, "get", side_effect=mock_get, autospec=True)
+    mocker.patch.object(yf.Ticker, "get_info", autospec=True, return_value={"symbol": "FLBK"})
+    tickers = [Ticker(symbol, datasource="SampleDataSource1") for symbol in ("SMBL", "FLBK")]
+
+    async def fetch():
+        return await asyncio.gather(*[ticker.get_summary_async() for ticker in tickers])
+
+    assert asyncio.run(fetch()) == [{"url": "https://generic.com/summary/SMBL"}, {"symbol": "FLBK"}]
+    assert asyncio.run(tickers[0].get_summary_async(force_refresh=True)) == {"url": "https://generic.com/summary/SMBL"}
+
+
+@pytest.mark.usefixtures("mock_ds_app_config")
+def test_ticker_summary_async_fallback_error(mocker):
+    """
+    Tests that a transport error of the fallback data source is raised as MarketDataException
+    """
+    httpx = pytest.importorskip("httpx")
+
+    async def mock_get(client, url, params=None, headers=None):
+        if url.startswith("https://generic.com"):
+            return httpx.Response(402, text="Payment required")
+        raise httpx.ConnectError("Connection refused")
+
+    mocker.patch.object(httpx.AsyncClient, "get", side_effect=mock_get, autospec=True)
+    ticker = Ticker("SMBL", datasource="SampleDataSource1", fallback_datasource="IEXCloud")
+    with pytest.raises(MarketDataException, match=r".*Error occurred while fetching data*."):
+        asyncio.run(ticker.get_summary_async())
+
+
+@pytest.mark.usefixtures("mock_ds_app_config")
+def test_ticker_reuses_datasources(mocker):
+    ticker = Ticker("SMBL", datasource="SampleDataSource1", fallback_datasource="SampleDataSource2")
+    create_ds = mocker.spy(ds, "create_datasource")
+    call_api = mocker.patch.object(ds.DataSource, "call_api", autospec=True, return_value={"symbol": "SMBL"})
+
+    ticker.get_summary(datasource="SampleDataSource1")
+    ticker.get_summary(datasource="SampleDataSource2")
+    assert create_ds.call_count == 0, "Data sources held by the ticker should be reused"
+    assert call_api.call_args[0][0] is ticker.fallback_datasource
+
+    ticker.get_summary(datasource="SampleDataSource3")
+    assert create_ds.call_count == 1
+
+
+def test_ticker_import_does_not_read_config():
+    code = "import marketdata.ticker, marketdata.util as util; assert vars(util)['__APP_CONFIG'] is None"
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).resolve().parents[2])
+
+
+@pytest.mark.usefixtures("mock_ds_app_config")
+def test_ticker_summary_datasource_override(mocker):
+    """
+    Tests overriding the data source of the ticker for a single call
+    """
+    ticker = Ticker("SMBL", datasource="SampleDataSource1", fallback_datasource="SampleDataSource2")
+    call_api = mocker.patch.object(ds.DataSource, "call_api", autospec=True, return_value={"symbol": "SMBL"})
+
+    assert ticker.get_summary(datasource="SampleDataSource3") == {"symbol": "SMBL"}
+    assert call_api.call_args[0][0].name == "SampleDataSource3"
@@ -0,0 +1,171 @@
+# Copyright (c) 2021, Madawa Soysa
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+from marketdata import datasource as ds
+from marketdata import util
+from marketdata.util import LRUCache, json_loads
+
+
+def test_lru_cache_put_get():
+    """
+    Tests retrieving items from the cache and evicting the least recently used item
+    """
+    cache = LRUCache(capacity=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert not hasattr(cache, "__dict__")
+
+
+def test_lru_cache_ttl():
+    """
+    Tests that the default ttl is used unless a ttl is provided when putting the item
+    """
+    cache = LRUCache(capacity=5, ttl=900)
+    cache.put("default", 1)
+    cache.put("expired", 2, ttl=-10)
+    assert "default" in cache
+    assert cache.get("default") == 1
+    assert "expired" not in cache
+    assert cache.get("expired") is None
+
+
+def test_lru_cache_no_expiry(mocker):
+    """
+    Tests that items put without a ttl do not expire
+    """
+    cache = LRUCache(capacity=5, ttl=None)
+    cache.put("default", 1)
+    cache.put("expiring", 2, ttl=900)
+    monotonic = util.time.monotonic() + 3600
+    mocker.patch("marketdata.util.time.monotonic", return_value=monotonic)
+    assert cache.get("default") == 1
+    assert "expiring" not in cache
+
+
+def test_lru_cache_get_or_create():
+    """
+    Tests that items are only created when they are not cached or have expired
+    """
+    cache = LRUCache(capacity=2)
+    assert cache.get_or_create("a", str.upper) == "A"
+    assert cache.get_or_create("a", lambda key: "created again") == "A"
+    cache.put("b", 2, ttl=-10)
+    assert cache.get_or_create("b", str.upper) == "B"
+    assert cache.get("b") == "B"
+
+
+def test_json_loads():
+    """
+    Tests decoding JSON documents from both bytes and str
+    """
+    assert json_loads(b'{"symbol": "SMBL", "marketcap": 2250499705006}') == {"symbol": "SMBL",
+                                                                             "marketcap": 2250499705006}
+    assert json_loads('[1.5, null]') == [1.5, None]
+
+
+def test_read_app_config_once(mocker, monkeypatch):
+    """
+    Tests that the app config file is parsed once when the global app config is not overridden
+    """
+    monkeypatch.setattr(util, "__APP_CONFIG", None)
+    monkeypatch.setattr(util, "__CONFIG_FILES", {})
+    load = mocker.spy(yaml, "load")
+    config = util.read_app_config(override_config=False)
+    assert util.read_app_config(override_config=False) is config
+    assert load.call_count == 1
+
+
+def test_read_app_config_file_modified(mocker, monkeypatch, tmp_path):
+    """
+    Tests that a config file is only parsed again after it has been modified, and that changes made to a returned
+    config are not kept
+    """
+    monkeypatch.setattr(util, "__APP_CONFIG", None)
+    monkeypatch.setattr(util, "__CONFIG_FILES", {})
+    load = mocker.spy(yaml, "load")
+    conf_file = tmp_path.joinpath("config.yaml")
+    conf_file.write_text("defaultDataSource: IEXCloud\n")
+
+    config = util.read_app_config(str(conf_file))
+    config["defaultDataSource"] = "YahooFinance"
+    assert util.read_app_config(str(conf_file)) == {"defaultDataSource": "IEXCloud"}
+    assert load.call_count == 1
+
+    conf_file.write_text("defaultDataSource: AlphaVantage\n")
+    assert util.read_app_config(str(conf_file))["defaultDataSource"] == "AlphaVantage"
+    assert load.call_count == 2
+
+
+def test_read_app_config_concurrently(mocker, monkeypatch):
+    """
+    Tests that the app config file is parsed once when threads read the global app config concurrently
+    """
+    monkeypatch.setattr(util, "__APP_CONFIG", None)
+    monkeypatch.setattr(util, "__CONFIG_FILES", {})
+    yaml_load = yaml.load
+
+    def slow_load(*args, **kwargs):
+        time.sleep(0.05)
+        return yaml_load(*args, **kwargs)
+
+    load = mocker.patch("marketdata.util.yaml.load", side_effect=slow_load)
+    with ThreadPoolExecutor(4) as executor:
+        configs = list(executor.map(lambda _: util.read_app_config(override_config=False), range(4)))
+    assert all(config is configs[0] for config in configs)
+    assert load.call_count == 1
+
+
+def test_read_app_config_reloads_datasources(monkeypatch, tmp_path):
+    """
+    Tests that reading the app config again initializes the data sources again, resolving tokens from environment
+    variables again
+    """
+    monkeypatch.setattr(util, "__APP_CONFIG", None)
+    monkeypatch.setattr(util, "__CONFIG_FILES", {})
+    monkeypatch.setenv("MD_TEST_IEX_TOKEN", "Tsk_first")
+    conf_file = tmp_path.joinpath("config.yaml")
+    conf_file.write_text("""
+datasources:
+  - name: "IEXCloud"
+    type: "IEXCloud"
+    isLibrary: False
+    isAuthenticated: True
+    baseUrl:
+      sandbox: "https://sandbox.iex.com"
+    authToken:
+      sandbox: "env.MD_TEST_IEX_TOKEN"
+    resourceMapping:
+      summary: "/stock/{}/stats"
+""")
+
+    util.read_app_config(str(conf_file))
+    iex = ds.create_datasource("IEXCloud")
+    assert iex._auth_token == {"sandbox": "Tsk_first"}
+
+    monkeypatch.setenv("MD_TEST_IEX_TOKEN", "Tsk_second")
+    util.read_app_config(str(conf_file))
+    assert ds.create_datasource("IEXCloud") is iex
+    assert iex._auth_token == {"sandbox": "Tsk_second"}
+    iex.close()